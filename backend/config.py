@@ -41,9 +41,19 @@ APP_TITLE = "Heart Disease Prediction API"
 # Model path (relative to the backend directory)
 MODEL_PATH = "heart_model.pkl"
 
+# Dataset locations (relative to the backend directory, like MODEL_PATH).
+# The binary column cache is rebuilt automatically when a CSV changes.
+DATASET_DIR = os.getenv("DATASET_DIR", os.path.join("..", "dataset"))
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(DATASET_DIR, ".cache"))
+TRAINING_DATASET = "heart_n.csv"
+
 # Database names / collections
 DB_NAME = "heart_disease_db"
+# One document per prediction, written by older versions (see
+# `python -m services.prediction_store --migrate`)
 PREDICTIONS_COLLECTION = "predictions"
+# Time-bucketed prediction storage (see services/prediction_store.py)
+PREDICTION_BUCKETS_COLLECTION = "prediction_buckets"
 API_KEYS_COLLECTION = "api_keys"
 
 # ------------------------------------
@@ -79,6 +89,9 @@ FEATURE_NAMES = [
     "restecg", "thalach", "exang", "oldpeak", "slope", "ca", "thal",
 ]
 
+# Integer-coded categorical features (the rest are continuous measurements)
+DISCRETE_FEATURES = ["sex", "cp", "fbs", "restecg", "exang", "slope", "ca", "thal"]
+
 # Human-readable feature labels (for reports & frontend)
 FEATURE_LABELS = {
     "age": "Your Age",
@@ -120,6 +133,146 @@ RISK_COLORS = {
     "High": "#e74c3c",
 }
 
+# ------------------------------------
+# Input drift monitoring
+# ------------------------------------
+DRIFT_ENABLED: bool = os.getenv("DRIFT_ENABLED", "true").lower() == "true"
+# Equal-width histogram bins for continuous features (discrete features
+# get one bin per valid value).
+DRIFT_BINS: int = int(os.getenv("DRIFT_BINS", "10"))
+# Live samples required before drift scores are reported
+DRIFT_MIN_SAMPLES: int = int(os.getenv("DRIFT_MIN_SAMPLES", "50"))
+# PSI thresholds: below "moderate" is stable, at/above "significant" is drift
+DRIFT_PSI_THRESHOLDS = {
+    "moderate": 0.1,
+    "significant": 0.25,
+}
+
+# ------------------------------------
+# What-if sweeps
+# ------------------------------------
+# Number of (base vector, sweep) results kept in the in-memory LRU cache
+WHATIF_CACHE_SIZE: int = int(os.getenv("WHATIF_CACHE_SIZE", "256"))
+
+# ------------------------------------
+# Reference SHAP distribution
+# ------------------------------------
+# SHAP values of every training row, stored once per model version so
+# /api/predict can report per-feature contribution percentiles.
+SHAP_REFERENCE_ENABLED: bool = os.getenv("SHAP_REFERENCE_ENABLED", "true").lower() == "true"
+SHAP_REFERENCE_DIR = os.getenv(
+    "SHAP_REFERENCE_DIR", os.path.join(DATASET_CACHE_DIR, "shap_reference")
+)
+
+# ------------------------------------
+# Admission control / bulkheads
+# ------------------------------------
+# Per-stage concurrency limits and bounded wait queues. Requests beyond
+# max_concurrent + max_queue are rejected with 503 + Retry-After.
+BULKHEADS = {
+    "predict": {
+        "max_concurrent": int(os.getenv("PREDICT_MAX_CONCURRENT", "8")),
+        "max_queue": int(os.getenv("PREDICT_MAX_QUEUE", "16")),
+    },
+    "shap": {
+        "max_concurrent": int(os.getenv("SHAP_MAX_CONCURRENT", "4")),
+        "max_queue": int(os.getenv("SHAP_MAX_QUEUE", "8")),
+    },
+    "report": {
+        "max_concurrent": int(os.getenv("REPORT_MAX_CONCURRENT", "2")),
+        "max_queue": int(os.getenv("REPORT_MAX_QUEUE", "4")),
+    },
+    "db": {
+        "max_concurrent": int(os.getenv("DB_MAX_CONCURRENT", "4")),
+        "max_queue": int(os.getenv("DB_MAX_QUEUE", "8")),
+    },
+    # SHAP interaction values are ~10x the cost of plain SHAP
+    "interactions": {
+        "max_concurrent": int(os.getenv("INTERACTIONS_MAX_CONCURRENT", "1")),
+        "max_queue": int(os.getenv("INTERACTIONS_MAX_QUEUE", "4")),
+    },
+    # Each running export holds at most one pooled Mongo connection at a time
+    "export": {
+        "max_concurrent": int(os.getenv("EXPORT_MAX_CONCURRENT", "2")),
+        "max_queue": int(os.getenv("EXPORT_MAX_QUEUE", "0")),
+    },
+}
+# Longest a request may wait in a stage queue before it is shed
+ADMISSION_DEADLINE_S: float = float(os.getenv("ADMISSION_DEADLINE_MS", "2000")) / 1000
+# When the SHAP stage is saturated, return the prediction without SHAP
+# instead of shedding the whole request.
+DEGRADED_MODE: bool = os.getenv("DEGRADED_MODE", "false").lower() == "true"
+
+# ------------------------------------
+# Background jobs (deferred SHAP explanations and PDF reports)
+# ------------------------------------
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE: int = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Seconds a finished job's result stays retrievable
+JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", "600"))
+# SQLite file shared by all worker processes on the host. Empty = in-memory
+# store, which only works with a single uvicorn worker.
+JOB_SQLITE_PATH: str = os.getenv("JOB_SQLITE_PATH", "jobs.sqlite3")
+
+# ------------------------------------
+# Prediction storage
+# ------------------------------------
+# Each prediction is appended to the open bucket document of its
+# PREDICTION_BUCKET_SPAN-second window; a bucket holds at most
+# PREDICTION_BUCKET_SIZE predictions before a new one is started.
+PREDICTION_BUCKET_SIZE: int = int(os.getenv("PREDICTION_BUCKET_SIZE", "200"))
+PREDICTION_BUCKET_SPAN: int = int(os.getenv("PREDICTION_BUCKET_SPAN", "3600"))
+# Buckets are removed by a TTL index this many days after their window starts (0 = keep forever)
+PREDICTION_RETENTION_DAYS: int = int(os.getenv("PREDICTION_RETENTION_DAYS", "90"))
+
+# ------------------------------------
+# Prediction export
+# ------------------------------------
+# Predictions fetched per Mongo getMore round trip (rounded to whole buckets)
+EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+# Streaming rate cap per export (0 = unlimited)
+EXPORT_MAX_DOCS_PER_SEC: int = int(os.getenv("EXPORT_MAX_DOCS_PER_SEC", "5000"))
+
+# ------------------------------------
+# Shadow model evaluation
+# ------------------------------------
+# Comma-separated candidate model files scored against live traffic off
+# the request path (empty = disabled).
+SHADOW_MODEL_PATHS = [p.strip() for p in os.getenv("SHADOW_MODEL_PATHS", "").split(",") if p.strip()]
+# Fraction of /api/predict inputs sampled for shadow scoring
+SHADOW_SAMPLE_RATE: float = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+# Samples waiting beyond this are dropped rather than queued
+SHADOW_QUEUE_SIZE: int = int(os.getenv("SHADOW_QUEUE_SIZE", "256"))
+SHADOW_BATCH_SIZE: int = int(os.getenv("SHADOW_BATCH_SIZE", "64"))
+# Upper bound on the share of one core the shadow worker may use
+SHADOW_MAX_CPU_FRACTION: float = float(os.getenv("SHADOW_MAX_CPU_FRACTION", "0.1"))
+
+# ------------------------------------
+# Similar-patient lookup
+# ------------------------------------
+# Historical cases (with outcomes) searched for nearest neighbours
+SIMILARITY_DATASET = os.getenv("SIMILARITY_DATASET", "heart.csv")
+SIMILARITY_INDEX_DIR = os.getenv(
+    "SIMILARITY_INDEX_DIR", os.path.join(DATASET_CACHE_DIR, "similarity")
+)
+
+# ------------------------------------
+# Health checks
+# ------------------------------------
+# Seconds between background deep checks; probes only read the cached result
+HEALTH_CHECK_INTERVAL: float = float(os.getenv("HEALTH_CHECK_INTERVAL", "10"))
+# Recent request latencies kept for the readiness p50 / p99
+HEALTH_LATENCY_WINDOW: int = int(os.getenv("HEALTH_LATENCY_WINDOW", "2048"))
+
+# ------------------------------------
+# SHAP interaction values
+# ------------------------------------
+# Per-row results cached by (model version, input vector)
+INTERACTION_CACHE_SIZE: int = int(os.getenv("INTERACTION_CACHE_SIZE", "1024"))
+# CPU threads one interaction computation may use (the model's own setting
+# would fan out across every core and compete with /api/predict)
+INTERACTION_THREADS: int = max(1, int(os.getenv("INTERACTION_THREADS", "1")))
+
 # ------------------------------------
 # Startup diagnostics
 # ------------------------------------
@@ -2,13 +2,21 @@
 Database module for MongoDB connection management.
 
 Provides a module-level singleton connection pool and a context manager
-for safe, reusable database connections. Also seeds initial API key data.
+for safe, reusable database connections. Also seeds initial API key data
+and creates the prediction bucket indexes / TTL retention.
 """
 # Fixes: FIX-7 (connection pool singleton)
 
 from contextlib import contextmanager
-from pymongo import MongoClient
-from config import MONGO_URI, DB_NAME, API_KEYS_COLLECTION, API_KEY_VALUE, logger
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import OperationFailure
+from config import (
+    MONGO_URI, DB_NAME, API_KEYS_COLLECTION, API_KEY_VALUE, PREDICTIONS_COLLECTION,
+    PREDICTION_BUCKETS_COLLECTION, PREDICTION_RETENTION_DAYS, logger,
+)
+
+# Server error code for an existing index with different options
+_INDEX_OPTIONS_CONFLICT = 85
 
 # ------------------------------------
 # Module-level singleton client
@@ -65,3 +73,57 @@ def init_api_key():
                 logger.info("API key initialized in database")
     except Exception as e:
         logger.warning(f"Could not initialize API key: {str(e)}")
+
+
+def init_prediction_indexes():
+    """
+    Create the prediction bucket indexes (idempotent):
+
+    - ``window, _id``: open-bucket lookups, time-range scans and resumable
+      export ordering
+    - ``window``: TTL retention, so a bucket expires PREDICTION_RETENTION_DAYS
+      after its time window starts (a plain index when retention is disabled)
+
+    Also warns when the legacy one-document-per-prediction collection still
+    holds data that should be migrated into buckets.
+    """
+    if not MONGO_URI:
+        return
+
+    try:
+        with get_db_connection() as db:
+            if db[PREDICTIONS_COLLECTION].estimated_document_count():
+                logger.warning(
+                    f"Legacy '{PREDICTIONS_COLLECTION}' collection is not exported; "
+                    "run `python -m services.prediction_store --migrate`"
+                )
+
+            buckets = db[PREDICTION_BUCKETS_COLLECTION]
+            buckets.create_index([("window", ASCENDING), ("_id", ASCENDING)], name="window_id")
+
+            if PREDICTION_RETENTION_DAYS <= 0:
+                try:
+                    buckets.create_index([("window", ASCENDING)], name="window")
+                except OperationFailure as e:
+                    if e.code != _INDEX_OPTIONS_CONFLICT:
+                        raise
+                    # Retention was just disabled: replace the TTL index with a plain one
+                    buckets.drop_index("window")
+                    buckets.create_index([("window", ASCENDING)], name="window")
+                logger.info("Prediction indexes ready (no retention)")
+                return
+
+            ttl = PREDICTION_RETENTION_DAYS * 86400
+            try:
+                buckets.create_index([("window", ASCENDING)], name="window", expireAfterSeconds=ttl)
+            except OperationFailure as e:
+                if e.code != _INDEX_OPTIONS_CONFLICT:
+                    raise
+                # Retention changed (or was just enabled): update the TTL in place
+                db.command(
+                    "collMod", PREDICTION_BUCKETS_COLLECTION,
+                    index={"name": "window", "expireAfterSeconds": ttl},
+                )
+            logger.info(f"Prediction indexes ready ({PREDICTION_RETENTION_DAYS}-day retention)")
+    except Exception as e:
+        logger.warning(f"Could not initialize prediction indexes: {str(e)}")
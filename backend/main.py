@@ -10,10 +10,17 @@ import sys
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import APP_TITLE, CORS_ORIGINS, logger
-from database import init_api_key, close_client
-from services.model_service import load_model
-from routes import health, predict, report
+from config import APP_TITLE, CORS_ORIGINS, DRIFT_ENABLED, SHAP_REFERENCE_ENABLED, logger
+from database import init_api_key, init_prediction_indexes, close_client
+from services.model_service import load_model, get_model_version
+from services import (
+    drift_service, shap_reference, job_service, shadow_service, similarity_service,
+    health_service,
+)
+from routes import (
+    health, predict, report, drift, whatif, admission, jobs, export, shadow, similar,
+    interactions,
+)
 from auth import create_signed_token, check_token_rate_limit
 
 # ------------------------------------
@@ -32,6 +39,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Request timing for the readiness p50 / p99 (probes excluded)
+app.add_middleware(health_service.LatencyMiddleware)
+
+
 # ------------------------------------
 # Startup: load model & seed data (FIX-8)
 # ------------------------------------
@@ -42,7 +54,18 @@ except (FileNotFoundError, RuntimeError) as e:
     sys.exit(1)
 
 predict.set_model(model)
+whatif.set_model(model)
+interactions.set_model(model)
 init_api_key()
+init_prediction_indexes()
+if DRIFT_ENABLED:
+    drift_service.init_reference()
+if SHAP_REFERENCE_ENABLED:
+    shap_reference.init_reference(model, get_model_version())
+job_service.start(model)
+shadow_service.start()
+similarity_service.init_index()
+health_service.start(model)
 
 # ------------------------------------
 # Register routers
@@ -50,6 +73,14 @@ init_api_key()
 app.include_router(health.router)
 app.include_router(predict.router)
 app.include_router(report.router)
+app.include_router(drift.router)
+app.include_router(whatif.router)
+app.include_router(admission.router)
+app.include_router(jobs.router)
+app.include_router(export.router)
+app.include_router(shadow.router)
+app.include_router(similar.router)
+app.include_router(interactions.router)
 
 
 
@@ -67,4 +98,5 @@ async def get_token(request: Request):
 
 @app.on_event("shutdown")
 def shutdown_db():
+    job_service.stop()
     close_client()
\ No newline at end of file
@@ -0,0 +1,18 @@
+"""
+Admission control route.
+
+Exposes per-stage bulkhead state (in-flight, queued, shed) and the
+number of degraded (no-SHAP) responses served under pressure.
+"""
+
+from fastapi import APIRouter, Header
+from auth import verify_api_key
+from services import admission
+
+router = APIRouter(prefix="/api", tags=["Monitoring"])
+
+
+@router.get("/admission")
+def admission_stats(api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+    return admission.stats()
@@ -0,0 +1,18 @@
+"""
+Drift monitoring route.
+
+Reports how live /api/predict inputs compare with the training data
+(PSI / KS scores per feature, computed from streaming statistics).
+"""
+
+from fastapi import APIRouter, Header
+from auth import verify_api_key
+from services import drift_service
+
+router = APIRouter(prefix="/api", tags=["Monitoring"])
+
+
+@router.get("/drift")
+def drift_report(api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+    return drift_service.monitor.report()
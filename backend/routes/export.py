@@ -0,0 +1,85 @@
+"""
+Export route.
+
+Streams stored predictions out of MongoDB as NDJSON or CSV, with
+time-range filters, field projection and resumable cursor pagination.
+"""
+
+import datetime
+from typing import Literal
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from auth import verify_api_key
+from database import get_db_connection
+from services.admission import bulkheads
+from services.export_service import EXPORT_FIELDS, parse_cursor, stream_predictions
+from config import MONGO_URI
+
+router = APIRouter(prefix="/api", tags=["Export"])
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that returns its bulkhead slot however the response
+    ends — including when the client is gone before the first chunk, in
+    which case the body generator never runs.
+    """
+
+    def __init__(self, content, bulkhead, started: float, **kwargs):
+        super().__init__(content, **kwargs)
+        self._bulkhead = bulkhead
+        self._started = started
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._bulkhead.release(self._started)
+
+
+@router.get("/predictions/export")
+def export_predictions(
+    api_key: str = Header(..., alias="api-key"),
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    after: str | None = Query(None, description="Resume after this _id"),
+    limit: int | None = Query(None, ge=1),
+    fields: str | None = Query(None, description="Comma-separated subset of fields"),
+):
+    verify_api_key(api_key)
+
+    if not MONGO_URI:
+        raise HTTPException(status_code=503, detail="Database not configured")
+
+    selected = EXPORT_FIELDS
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in EXPORT_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}")
+    cursor = None
+    if after is not None:
+        try:
+            cursor = parse_cursor(after)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
+
+    # Hold an export slot for the whole stream so concurrent exports can't
+    # monopolise the Mongo connection pool (sheds with 503 when full).
+    bulkhead = bulkheads["export"]
+    started = bulkhead.acquire()
+
+    def body():
+        with get_db_connection() as db:
+            yield from stream_predictions(db, start, end, cursor, selected, format, limit)
+
+    return _SlotStreamingResponse(
+        body(),
+        bulkhead,
+        started,
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=predictions.{format}"},
+    )
@@ -1,11 +1,16 @@
 """
-Health-check route.
+Health-check routes.
 
-A lightweight endpoint to verify the API is running —
+Lightweight endpoints to verify the API is running —
 used by monitoring, load balancers, and the frontend connection test.
+
+Liveness and readiness only read the snapshot cached by
+services/health_service.py, so probes never hit MongoDB or the model.
 """
 
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from services import health_service
 
 router = APIRouter()
 
@@ -13,3 +18,19 @@ router = APIRouter()
 @router.get("/")
 def read_root():
     return {"message": "Heart Disease Prediction API", "status": "running"}
+
+
+@router.get("/api/health", tags=["Health"])
+def liveness():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@router.get("/api/health/ready", tags=["Health"])
+def readiness():
+    """
+    Readiness: model loaded, explainer warm, plus Mongo status, queue
+    depths and recent latency. Returns 503 until the service can serve.
+    """
+    snapshot = health_service.readiness()
+    return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
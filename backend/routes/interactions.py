@@ -0,0 +1,43 @@
+"""
+SHAP interactions route.
+
+Returns the strongest pairwise feature interactions (e.g. age x thalach)
+for one or more patients, explained in a single batched call.
+"""
+
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException
+from schemas import InteractionRequest
+from auth import verify_api_key
+from services.model_service import prepare_input, get_model_version
+from services.interaction_service import top_interactions
+from services.admission import bulkheads
+from config import logger
+
+router = APIRouter(prefix="/api", tags=["Prediction"])
+
+# The loaded model instance is injected at startup (see main.py)
+_model = None
+
+
+def set_model(model):
+    """Called once at startup to inject the loaded model."""
+    global _model
+    _model = model
+
+
+@router.post("/interactions")
+def interactions_endpoint(data: InteractionRequest, api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+
+    try:
+        X = np.vstack([prepare_input(p) for p in data.patients])
+        with bulkheads["interactions"].slot():
+            results = top_interactions(_model, get_model_version(), X, data.top_k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during interaction computation: {str(e)}")
+        raise HTTPException(status_code=500, detail="Interaction service error")
+
+    return {"results": results}
@@ -0,0 +1,60 @@
+"""
+Job routes.
+
+Status and result retrieval for background explanation / report jobs
+queued by /api/predict?explain=async and /api/report/async.
+"""
+
+from io import BytesIO
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from auth import verify_api_key
+from services import job_service
+
+router = APIRouter(prefix="/api", tags=["Jobs"])
+
+
+def _get_job(job_id: str) -> dict:
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+def _status(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "type": job["type"],
+        "status": job["status"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+        "expires_at": job["expires_at"],
+        "result_url": f"/api/jobs/{job['id']}/result",
+    }
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str, api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+    return _status(_get_job(job_id))
+
+
+@router.get("/jobs/{job_id}/result")
+def job_result(job_id: str, api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+    job = _get_job(job_id)
+
+    if job["status"] == job_service.FAILED:
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != job_service.DONE:
+        # Not ready yet — tell the client to poll again
+        return JSONResponse(status_code=202, content=_status(job), headers={"Retry-After": "1"})
+
+    if job["media_type"] == "application/pdf":
+        return StreamingResponse(
+            BytesIO(job["result"]),
+            media_type="application/pdf",
+            headers={"Content-Disposition": "attachment; filename=Heart_Disease_Report.pdf"},
+        )
+    return job["result"]
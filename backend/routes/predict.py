@@ -5,13 +5,21 @@ Accepts patient data, runs the ML model, computes SHAP explanations,
 and optionally persists the prediction to MongoDB.
 """
 
-from fastapi import APIRouter, Header, HTTPException
+from typing import Literal
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException
 from schemas import HeartInput
 from auth import verify_api_key
 from services.model_service import predict
 from services.shap_service import compute_shap
+from services import (
+    drift_service, shap_reference, job_service, shadow_service, prediction_store,
+)
+from services.admission import bulkheads, Overloaded, record_degraded
 from database import get_db_connection
-from config import MONGO_URI, PREDICTIONS_COLLECTION, logger
+from config import (
+    MONGO_URI, DRIFT_ENABLED, SHAP_REFERENCE_ENABLED,
+    DEGRADED_MODE, SHADOW_MODEL_PATHS, logger,
+)
 
 router = APIRouter(prefix="/api", tags=["Prediction"])
 
@@ -25,29 +33,81 @@ def set_model(model):
     _model = model
 
 
+def _inline_shap(result: dict) -> dict:
+    """
+    Compute SHAP (plus reference percentiles) on the request path.
+    Falls back to a SHAP-less response in degraded mode when saturated.
+    """
+    try:
+        with bulkheads["shap"].slot():
+            shap_result = compute_shap(_model, result["X"])
+    except Overloaded:
+        if not DEGRADED_MODE:
+            raise
+        record_degraded()
+        return {
+            "shap_values": {},
+            "top_risk_factors": [],
+            "base_value": None,
+            "degraded": True,
+        }
+
+    # Population context from the precomputed reference (binary search only)
+    if SHAP_REFERENCE_ENABLED:
+        context = shap_reference.percentiles(
+            shap_result["shap_values"], result["risk_probability"]
+        )
+        if context:
+            shap_result.update(context)
+    return shap_result
+
+
 @router.post("/predict")
-def predict_endpoint(data: HeartInput, api_key: str = Header(..., alias="api-key")):
+def predict_endpoint(
+    data: HeartInput,
+    background_tasks: BackgroundTasks,
+    api_key: str = Header(..., alias="api-key"),
+    explain: Literal["inline", "async"] = "inline",
+):
+    """
+    With ``?explain=async`` the risk score is returned immediately and the
+    SHAP explanation is computed by a background job (see /api/jobs).
+    """
     # amazonq-ignore-next-line
     verify_api_key(api_key)
 
     try:
         # 1. Model prediction
-        result = predict(_model, data)
+        with bulkheads["predict"].slot():
+            result = predict(_model, data)
+        if DRIFT_ENABLED:
+            drift_service.record(result["X"])
+        if SHADOW_MODEL_PATHS and shadow_service.sample():
+            # Queued only after the response has been sent
+            background_tasks.add_task(
+                shadow_service.submit, result["X"], result["probability"]
+            )
 
-        # 2. SHAP explainability
-        shap_result = compute_shap(_model, result["X"])
+        # 2. SHAP explainability — deferred to a background job, or inline
+        if explain == "async":
+            job_id = job_service.submit("explain", {
+                "features": result["X"][0].tolist(),
+                "risk_probability": result["risk_probability"],
+            })
+            shap_result = {
+                "explanation_job_id": job_id,
+                "explanation_url": f"/api/jobs/{job_id}/result",
+            }
+        else:
+            shap_result = _inline_shap(result)
 
         # 3. Persist to MongoDB (non-blocking — failures don't stop the response)
         if MONGO_URI:
             try:
-                with get_db_connection() as db:
-                    predictions_col = db[PREDICTIONS_COLLECTION]
-                    prediction_data = {
-                        **data.dict(),
-                        "risk_probability": result["risk_probability"],
-                        "risk_level": result["risk_level"],
-                    }
-                    predictions_col.insert_one(prediction_data)
+                with bulkheads["db"].slot(), get_db_connection() as db:
+                    prediction_store.record(
+                        db, data, result["risk_probability"], result["risk_level"]
+                    )
             except Exception as e:
                 logger.error(f"Error saving prediction to database: {str(e)}")
 
@@ -58,6 +118,8 @@ def predict_endpoint(data: HeartInput, api_key: str = Header(..., alias="api-key
             **shap_result,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during prediction: {str(e)}")
         raise HTTPException(status_code=500, detail="Prediction service error")
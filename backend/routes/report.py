@@ -9,6 +9,8 @@ from fastapi.responses import StreamingResponse
 from schemas import ReportRequest
 from auth import verify_api_key
 from services.report_service import generate_pdf
+from services.admission import bulkheads
+from services import job_service
 
 router = APIRouter(prefix="/api", tags=["Report"])
 
@@ -17,10 +19,20 @@ router = APIRouter(prefix="/api", tags=["Report"])
 def generate_report(data: ReportRequest, api_key: str = Header(..., alias="api-key")):
     verify_api_key(api_key)
 
-    buffer = generate_pdf(data)
+    with bulkheads["report"].slot():
+        buffer = generate_pdf(data)
 
     return StreamingResponse(
         buffer,
         media_type="application/pdf",
         headers={"Content-Disposition": "attachment; filename=Heart_Disease_Report.pdf"},
     )
+
+
+@router.post("/report/async", status_code=202)
+def generate_report_async(data: ReportRequest, api_key: str = Header(..., alias="api-key")):
+    """Queue the PDF render and return a job ID to poll instead of waiting."""
+    verify_api_key(api_key)
+
+    job_id = job_service.submit("report", data.model_dump())
+    return {"job_id": job_id, "status_url": f"/api/jobs/{job_id}"}
@@ -0,0 +1,18 @@
+"""
+Shadow evaluation route.
+
+Reports how candidate models compare with the primary model on sampled
+live traffic (agreement, probability deltas, risk-level flips).
+"""
+
+from fastapi import APIRouter, Header
+from auth import verify_api_key
+from services import shadow_service
+
+router = APIRouter(prefix="/api", tags=["Monitoring"])
+
+
+@router.get("/shadow")
+def shadow_stats(api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+    return shadow_service.stats()
@@ -0,0 +1,36 @@
+"""
+Similar-patients route.
+
+Returns the k most similar historical cases (with outcomes) for one or
+more patients, as supporting context for a prediction.
+"""
+
+import numpy as np
+from fastapi import APIRouter, Header, HTTPException
+from schemas import SimilarRequest
+from auth import verify_api_key
+from services.model_service import prepare_input
+from services.similarity_service import find_similar
+from services.admission import bulkheads
+from config import logger
+
+router = APIRouter(prefix="/api", tags=["Prediction"])
+
+
+@router.post("/similar")
+def similar_endpoint(data: SimilarRequest, api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+
+    try:
+        X = np.vstack([prepare_input(p) for p in data.patients])
+        with bulkheads["predict"].slot():
+            results = find_similar(X, data.k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during similar-patient lookup: {str(e)}")
+        raise HTTPException(status_code=500, detail="Similarity service error")
+
+    if results is None:
+        raise HTTPException(status_code=503, detail="Similarity index not available")
+    return {"results": results}
@@ -0,0 +1,41 @@
+"""
+What-if route.
+
+Sweeps one or two features of a patient's input over their valid range
+and returns the resulting risk curve (or surface) in a single call.
+"""
+
+from fastapi import APIRouter, Header, HTTPException
+from schemas import WhatIfRequest
+from auth import verify_api_key
+from services.model_service import prepare_input
+from services.whatif_service import risk_sweep
+from services.admission import bulkheads
+from config import logger
+
+router = APIRouter(prefix="/api", tags=["Prediction"])
+
+# The loaded model instance is injected at startup (see main.py)
+_model = None
+
+
+def set_model(model):
+    """Called once at startup to inject the loaded model."""
+    global _model
+    _model = model
+
+
+@router.post("/whatif")
+def whatif_endpoint(data: WhatIfRequest, api_key: str = Header(..., alias="api-key")):
+    verify_api_key(api_key)
+
+    try:
+        base_X = prepare_input(data.base)
+        stage = "shap" if data.include_shap else "predict"
+        with bulkheads[stage].slot():
+            return risk_sweep(_model, base_X, data.features, data.steps, data.include_shap)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during what-if sweep: {str(e)}")
+        raise HTTPException(status_code=500, detail="What-if service error")
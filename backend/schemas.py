@@ -39,6 +39,46 @@ class HeartInput(BaseModel):
         return f
 
 
+class WhatIfRequest(BaseModel):
+    """Input schema for the /api/whatif endpoint."""
+
+    base: HeartInput
+    features: list[str] = Field(
+        min_length=1, max_length=2,
+        description="One feature (risk curve) or two features (risk surface) to sweep",
+    )
+    steps: int = Field(
+        default=25, ge=2, le=50,
+        description="Grid points per continuous feature (discrete features use every valid value)",
+    )
+    include_shap: bool = False
+
+    @field_validator("features")
+    @classmethod
+    def known_distinct_features(cls, v):
+        """Only model features may be swept, and each at most once."""
+        unknown = [f for f in v if f not in HeartInput.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown features: {unknown}")
+        if len(set(v)) != len(v):
+            raise ValueError("features must be distinct")
+        return v
+
+
+class SimilarRequest(BaseModel):
+    """Input schema for the /api/similar endpoint."""
+
+    patients: list[HeartInput] = Field(min_length=1, max_length=256)
+    k: int = Field(default=5, ge=1, le=50, description="Neighbours returned per patient")
+
+
+class InteractionRequest(BaseModel):
+    """Input schema for the /api/interactions endpoint."""
+
+    patients: list[HeartInput] = Field(min_length=1, max_length=64)
+    top_k: int = Field(default=5, ge=1, le=78, description="Feature pairs returned per patient")
+
+
 class ReportRequest(BaseModel):
     """Input schema for the /api/report endpoint."""
 
@@ -60,3 +100,16 @@ class ReportRequest(BaseModel):
     shap_values: dict
     top_risk_factors: list
     base_value: float
+
+
+def get_feature_bounds() -> dict:
+    """
+    Return {feature_name: (min, max)} taken from the HeartInput ge/le
+    constraints, so services share one source of truth for valid ranges.
+    """
+    bounds = {}
+    for name, field in HeartInput.model_fields.items():
+        lo = next(m.ge for m in field.metadata if hasattr(m, "ge"))
+        hi = next(m.le for m in field.metadata if hasattr(m, "le"))
+        bounds[name] = (float(lo), float(hi))
+    return bounds
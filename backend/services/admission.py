@@ -0,0 +1,148 @@
+"""
+Admission control service.
+
+Each expensive stage (model prediction, SHAP, PDF report, exports)
+gets its own bulkhead: a concurrency limit plus a bounded wait queue. A
+burst of slow report renders therefore queues behind the report bulkhead
+only, instead of occupying every worker thread and starving cheap
+predictions.
+
+Requests are shed early with 503 + Retry-After when the queue is full or
+when the expected queue wait (queue depth x recent service time) would
+exceed ADMISSION_DEADLINE_S, rather than timing out after waiting.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from fastapi import HTTPException
+from config import BULKHEADS, ADMISSION_DEADLINE_S
+
+# Weight of the newest sample in the service-time moving average
+_EWMA_ALPHA = 0.2
+
+
+class Overloaded(HTTPException):
+    """Raised when a stage sheds a request; FastAPI renders it as 503 + Retry-After."""
+
+    def __init__(self, stage: str, retry_after: float):
+        self.stage = stage
+        super().__init__(
+            status_code=503,
+            detail=f"Service overloaded ({stage}). Retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded, deadline-aware wait queue."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, deadline_s: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.deadline_s = deadline_s
+        self._sem = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self._service_time: float | None = None   # EWMA, seconds
+
+    def _expected_wait(self) -> float:
+        """Estimated queue wait for a new arrival (0 until a sample exists)."""
+        if self._service_time is None:
+            return 0.0
+        return (self.waiting + 1) / self.max_concurrent * self._service_time
+
+    def _shed(self, retry_after: float):
+        self.shed += 1
+        raise Overloaded(self.name, retry_after)
+
+    def acquire(self) -> float:
+        """
+        Take one slot of this stage, waiting in the bounded queue if needed.
+        Returns the start time to pass to release(); raises Overloaded when shed.
+        """
+        with self._lock:
+            acquired = self._sem.acquire(blocking=False)
+            if not acquired:
+                expected = self._expected_wait()
+                if self.waiting >= self.max_queue or expected > self.deadline_s:
+                    self._shed(expected or self.deadline_s)
+                self.waiting += 1
+
+        if not acquired:
+            acquired = self._sem.acquire(timeout=self.deadline_s)
+            with self._lock:
+                self.waiting -= 1
+                if not acquired:
+                    self._shed(self._expected_wait() or self.deadline_s)
+
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+        return time.perf_counter()
+
+    def release(self, start: float) -> None:
+        """Return a slot taken by acquire() and record its service time."""
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.in_flight -= 1
+            self._service_time = elapsed if self._service_time is None else (
+                _EWMA_ALPHA * elapsed + (1 - _EWMA_ALPHA) * self._service_time
+            )
+        self._sem.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold one slot of this stage for the duration of the ``with`` block."""
+        start = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(start)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "service_time_ms": (
+                round(self._service_time * 1000, 2) if self._service_time is not None else None
+            ),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Module-level bulkheads, one per stage
+# ---------------------------------------------------------------------------
+bulkheads = {
+    name: Bulkhead(name, limits["max_concurrent"], limits["max_queue"], ADMISSION_DEADLINE_S)
+    for name, limits in BULKHEADS.items()
+}
+
+# Responses served without SHAP because the SHAP stage was saturated
+_degraded = 0
+_degraded_lock = threading.Lock()
+
+
+def record_degraded() -> None:
+    global _degraded
+    with _degraded_lock:
+        _degraded += 1
+
+
+def stats() -> dict:
+    """Per-stage bulkhead state plus shed / degraded totals."""
+    stages = {name: b.stats() for name, b in bulkheads.items()}
+    return {
+        "stages": stages,
+        "shed_total": sum(s["shed"] for s in stages.values()),
+        "degraded_total": _degraded,
+    }
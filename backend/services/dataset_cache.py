@@ -0,0 +1,329 @@
+"""
+Dataset cache service.
+
+Converts the CSV datasets in DATASET_DIR into a typed, memory-mapped
+columnar cache (one ``.npy`` file per column plus a JSON manifest holding
+the source hash). Exact duplicate rows are collapsed into a single row with
+an integer weight, so ``heart.csv`` (1025 rows, ~300 unique) is stored and
+scored once per distinct patient.
+
+The cache is rebuilt automatically whenever the source CSV changes, so
+callers simply use ``load_dataset()`` instead of ``pd.read_csv``.
+
+Rebuild manually from the backend directory with:
+    python -m services.dataset_cache [heart.csv heart_n.csv ...]
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+import numpy as np
+from config import DATASET_DIR, DATASET_CACHE_DIR, TRAINING_DATASET, logger
+
+try:
+    import fcntl
+except ImportError:            # Windows: builds are not serialised across processes
+    fcntl = None
+
+# Bump when the on-disk layout changes so stale caches are rebuilt.
+_CACHE_VERSION = 1
+_MANIFEST_NAME = "manifest.json"
+_WEIGHT_COLUMN = "__weight__"
+_LOCK_NAME = ".build.lock"
+
+# Process-wide memo of opened caches: {csv_name: CachedDataset}
+_loaded: dict = {}
+_lock = threading.Lock()
+
+
+class CachedDataset:
+    """
+    Read-only view over a cached dataset.
+
+    Attributes
+    ----------
+    name           – source CSV file name
+    columns        – {column_name: np.ndarray (memory-mapped, read-only)}
+    weights        – number of source rows collapsed into each cached row
+    n_source_rows  – row count of the original CSV
+    source_sha256  – hash of the CSV the cache was built from
+    """
+
+    def __init__(self, name: str, columns: dict, weights: np.ndarray, manifest: dict):
+        self.name = name
+        self.columns = columns
+        self.weights = weights
+        self.n_source_rows = int(manifest["n_source_rows"])
+        self.source_sha256 = manifest["source_sha256"]
+
+    def __len__(self) -> int:
+        return int(self.weights.shape[0])
+
+    def matrix(self, names=None, dtype=np.float64) -> np.ndarray:
+        """
+        Stack *names* (default: every column except ``target``) into a
+        C-contiguous 2-D array ready for ``model.predict_proba``.
+        """
+        if names is None:
+            names = [c for c in self.columns if c != "target"]
+        return np.column_stack([self.columns[n] for n in names]).astype(dtype, copy=False)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _sha256(path: str) -> str:
+    """Return the hex SHA-256 of the file at *path*."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_dir(name: str) -> str:
+    return os.path.join(DATASET_CACHE_DIR, os.path.splitext(name)[0])
+
+
+def _column_dtype(values: np.ndarray) -> np.dtype:
+    """Pick the narrowest integer dtype for integral columns, float64 otherwise."""
+    if values.size and np.all(values == np.round(values)):
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if values.min() >= info.min and values.max() <= info.max:
+                return np.dtype(dtype)
+    return np.dtype(np.float64)
+
+
+def _read_csv(path: str):
+    """Parse a numeric CSV into (header, float64 matrix)."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader)]
+        rows = [row for row in reader if row]
+    data = np.array(rows, dtype=np.float64)
+    if data.ndim != 2 or data.shape[1] != len(header):
+        raise ValueError(f"Dataset '{path}' has inconsistent row lengths")
+    return header, data
+
+
+def _read_manifest(cache_dir: str) -> dict | None:
+    manifest = load_json(cache_dir, _MANIFEST_NAME)
+    if manifest is None or manifest.get("version") != _CACHE_VERSION:
+        return None
+    return manifest
+
+
+def _atomic_write(cache_dir: str, filename: str, write) -> None:
+    """
+    Write *filename* via a uniquely named temp file + ``os.replace`` so
+    concurrent readers never see a partial file and concurrent writers
+    never share a temp file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, prefix=f".{filename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.chmod(tmp, 0o644)     # mkstemp creates 0600; keep caches readable like before
+        os.replace(tmp, os.path.join(cache_dir, filename))
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def save_array(cache_dir: str, name: str, values: np.ndarray) -> None:
+    """Write *values* to <name>.npy atomically."""
+    _atomic_write(cache_dir, f"{name}.npy", lambda f: np.save(f, values))
+
+
+def save_json(cache_dir: str, filename: str, data: dict) -> None:
+    """Write *data* to *filename* as JSON atomically."""
+    _atomic_write(
+        cache_dir, filename, lambda f: f.write(json.dumps(data, indent=2).encode())
+    )
+
+
+def load_json(cache_dir: str, filename: str) -> dict | None:
+    """Read *filename* as JSON, or return None if it is missing or unreadable."""
+    try:
+        with open(os.path.join(cache_dir, filename)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+@contextmanager
+def build_lock(cache_dir: str):
+    """
+    Hold an exclusive lock on *cache_dir* while it is (re)built, so worker
+    processes that start together build it once instead of racing.
+    Callers should re-check freshness after acquiring it.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(os.path.join(cache_dir, _LOCK_NAME), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_or_build(cache_dir: str, manifest_name: str, is_stale, build) -> dict:
+    """
+    Return the manifest *manifest_name* of a derived cache in *cache_dir*,
+    calling *build()* to (re)build the cache when ``is_stale(manifest)``.
+
+    The manifest is checked first without the lock, so the common case of a
+    fresh cache never blocks; otherwise it is re-checked under build_lock so
+    workers starting together build once. *build* writes the cache and
+    returns its new manifest.
+    """
+    manifest = load_json(cache_dir, manifest_name)
+    if is_stale(manifest):
+        with build_lock(cache_dir):
+            # Another worker may have built it while we waited
+            manifest = load_json(cache_dir, manifest_name)
+            if is_stale(manifest):
+                manifest = build()
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Build / load
+# ---------------------------------------------------------------------------
+
+def build_cache(name: str) -> dict:
+    """
+    (Re)build the cache for DATASET_DIR/*name* and return its manifest.
+
+    Column files are written first and the manifest last, so a crash
+    mid-build leaves the previous manifest (or none) and triggers a rebuild.
+    """
+    with build_lock(_cache_dir(name)):
+        return _build_cache(name)
+
+
+def _build_cache(name: str) -> dict:
+    source = os.path.join(DATASET_DIR, name)
+    header, data = _read_csv(source)
+
+    # Collapse exact duplicates, keeping first-occurrence order
+    unique, first_idx, counts = np.unique(
+        data, axis=0, return_index=True, return_counts=True
+    )
+    order = np.argsort(first_idx)
+    unique, counts = unique[order], counts[order]
+
+    cache_dir = _cache_dir(name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    dtypes = {}
+    for i, column in enumerate(header):
+        dtype = _column_dtype(unique[:, i])
+        save_array(cache_dir, column, np.ascontiguousarray(unique[:, i].astype(dtype)))
+        dtypes[column] = dtype.name
+    save_array(cache_dir, _WEIGHT_COLUMN, counts.astype(np.int32))
+
+    stat = os.stat(source)
+    manifest = {
+        "version": _CACHE_VERSION,
+        "source": name,
+        "source_sha256": _sha256(source),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "n_source_rows": int(data.shape[0]),
+        "n_rows": int(unique.shape[0]),
+        "columns": dtypes,
+    }
+    save_json(cache_dir, _MANIFEST_NAME, manifest)
+
+    logger.info(
+        f"Dataset cache built for '{name}': {manifest['n_source_rows']} rows "
+        f"-> {manifest['n_rows']} unique"
+    )
+    return manifest
+
+
+def _source_unchanged(source: str, manifest: dict) -> bool:
+    """Cheap check: unchanged size + mtime means unchanged content."""
+    stat = os.stat(source)
+    return (stat.st_size, stat.st_mtime_ns) == (
+        manifest["source_size"], manifest["source_mtime_ns"]
+    )
+
+
+def _fresh_manifest(name: str) -> dict:
+    """Return an up-to-date manifest for *name*, rebuilding the cache if stale."""
+    source = os.path.join(DATASET_DIR, name)
+    cache_dir = _cache_dir(name)
+    manifest = _read_manifest(cache_dir)
+
+    if not os.path.exists(source):
+        if manifest is None:
+            raise FileNotFoundError(f"Dataset '{source}' not found and no cache available.")
+        logger.warning(f"Dataset '{source}' missing — serving cached copy")
+        return manifest
+
+    if manifest is not None and _source_unchanged(source, manifest):
+        return manifest
+
+    with build_lock(cache_dir):
+        # Another worker may have rebuilt the cache while we waited
+        manifest = _read_manifest(cache_dir)
+        if manifest is None:
+            return _build_cache(name)
+        if _source_unchanged(source, manifest):
+            return manifest
+
+        # File was touched — only rebuild if the content actually changed
+        if _sha256(source) == manifest["source_sha256"]:
+            stat = os.stat(source)
+            manifest["source_size"] = stat.st_size
+            manifest["source_mtime_ns"] = stat.st_mtime_ns
+            save_json(cache_dir, _MANIFEST_NAME, manifest)
+            return manifest
+        return _build_cache(name)
+
+
+def load_dataset(name: str = TRAINING_DATASET) -> CachedDataset:
+    """
+    Return the cached, de-duplicated dataset for DATASET_DIR/*name*.
+
+    Columns are memory-mapped read-only, so repeated loads (and multiple
+    worker processes) share the same pages instead of re-parsing CSV text.
+    """
+    with _lock:
+        manifest = _fresh_manifest(name)
+        cached = _loaded.get(name)
+        if cached is not None and cached.source_sha256 == manifest["source_sha256"]:
+            return cached
+
+        cache_dir = _cache_dir(name)
+        columns = {
+            column: np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode="r")
+            for column in manifest["columns"]
+        }
+        weights = np.load(os.path.join(cache_dir, f"{_WEIGHT_COLUMN}.npy"), mmap_mode="r")
+        cached = CachedDataset(name, columns, weights, manifest)
+        _loaded[name] = cached
+        return cached
+
+
+if __name__ == "__main__":
+    for dataset_name in sys.argv[1:] or sorted(
+        f for f in os.listdir(DATASET_DIR) if f.endswith(".csv")
+    ):
+        m = build_cache(dataset_name)
+        print(f"{dataset_name}: {m['n_source_rows']} rows -> {m['n_rows']} unique, "
+              f"sha256={m['source_sha256'][:12]}")
@@ -0,0 +1,225 @@
+"""
+Input drift monitoring service.
+
+Keeps streaming statistics of live HeartInput traffic and compares them
+with the training distribution:
+
+- Welford running mean / variance per feature
+- fixed-bin histograms over the HeartInput bounds (continuous features)
+- category frequencies, i.e. one bin per valid value (discrete features)
+
+Each request is folded in with a handful of vectorised numpy operations on
+one of a fixed set of shards (threads are spread across them round-robin,
+each shard has its own lock), so updates are O(1) in time, memory stays
+constant however many worker threads come and go, and lock contention is
+rare. Shards are merged only when a report is requested.
+"""
+
+import datetime
+import itertools
+import threading
+import numpy as np
+from schemas import get_feature_bounds
+from services.dataset_cache import load_dataset
+from config import (
+    FEATURE_NAMES, DISCRETE_FEATURES, TRAINING_DATASET,
+    DRIFT_BINS, DRIFT_MIN_SAMPLES, DRIFT_PSI_THRESHOLDS, logger,
+)
+
+# Floor applied to bin proportions so PSI stays finite for empty bins
+_PSI_EPSILON = 1e-4
+# Fixed number of statistics shards shared by all request threads
+_N_SHARDS = 16
+
+
+class _Shard:
+    """Statistics written by the threads assigned to this shard."""
+
+    __slots__ = ("lock", "count", "mean", "m2", "hist")
+
+    def __init__(self, n_features: int, n_bins: int):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.hist = np.zeros(n_bins, dtype=np.int64)
+
+
+class DriftMonitor:
+    """Streaming per-feature statistics with PSI / KS scoring against a reference."""
+
+    def __init__(self, bounds: dict, discrete: list, bins: int):
+        lo, width, n_bins = [], [], []
+        for name in FEATURE_NAMES:
+            f_lo, f_hi = bounds[name]
+            if name in discrete:
+                # One bin per integer value, centred on the value
+                lo.append(f_lo - 0.5)
+                width.append(1.0)
+                n_bins.append(int(f_hi - f_lo) + 1)
+            else:
+                lo.append(f_lo)
+                width.append((f_hi - f_lo) / bins)
+                n_bins.append(bins)
+
+        self._lo = np.array(lo)
+        self._width = np.array(width)
+        self._max_bin = np.array(n_bins) - 1
+        self._offsets = np.concatenate(([0], np.cumsum(n_bins)[:-1]))
+        self._n_bins = n_bins
+        self._total_bins = int(sum(n_bins))
+
+        self._local = threading.local()
+        self._shards = [_Shard(len(FEATURE_NAMES), self._total_bins) for _ in range(_N_SHARDS)]
+        self._next_shard = itertools.count()
+        self._reference: dict | None = None
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+
+    # ------------------------------------------------------------------
+    # Binning
+    # ------------------------------------------------------------------
+
+    def _bin_index(self, X: np.ndarray) -> np.ndarray:
+        """Map rows of *X* (n, n_features) to flat histogram indices."""
+        idx = np.floor((X - self._lo) / self._width).astype(np.int64)
+        np.clip(idx, 0, self._max_bin, out=idx)
+        return idx + self._offsets
+
+    # ------------------------------------------------------------------
+    # Live updates (request path)
+    # ------------------------------------------------------------------
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Round-robin assignment spreads threads evenly across shards
+            shard = self._shards[next(self._next_shard) % _N_SHARDS]
+            self._local.shard = shard
+        return shard
+
+    def update(self, x: np.ndarray) -> None:
+        """Fold a single feature vector (FEATURE_NAMES order) into the stats."""
+        idx = self._bin_index(x)
+        shard = self._shard()
+        with shard.lock:
+            shard.count += 1
+            delta = x - shard.mean
+            shard.mean += delta / shard.count
+            shard.m2 += delta * (x - shard.mean)
+            shard.hist[idx] += 1
+
+    def _merged(self):
+        """Combine all shards (Chan et al. parallel variance merge)."""
+        count, mean, m2 = 0, np.zeros(len(FEATURE_NAMES)), np.zeros(len(FEATURE_NAMES))
+        hist = np.zeros(self._total_bins, dtype=np.int64)
+        for s in self._shards:
+            with s.lock:
+                n_b = s.count
+                mean_b, m2_b, hist_b = s.mean.copy(), s.m2.copy(), s.hist.copy()
+            if n_b == 0:
+                continue
+            n = count + n_b
+            delta = mean_b - mean
+            mean = mean + delta * (n_b / n)
+            m2 = m2 + m2_b + delta ** 2 * (count * n_b / n)
+            count = n
+            hist += hist_b
+        return count, mean, m2, hist
+
+    # ------------------------------------------------------------------
+    # Reference distribution
+    # ------------------------------------------------------------------
+
+    def set_reference(self, X: np.ndarray, weights: np.ndarray, source: str) -> None:
+        """Precompute reference histograms / moments from training rows."""
+        weights = np.asarray(weights, dtype=np.float64)
+        idx = self._bin_index(X)
+        hist = np.bincount(
+            idx.ravel(), weights=np.repeat(weights, X.shape[1]),
+            minlength=self._total_bins,
+        )
+        mean = np.average(X, axis=0, weights=weights)
+        std = np.sqrt(np.average((X - mean) ** 2, axis=0, weights=weights))
+        self._reference = {"source": source, "hist": hist, "mean": mean, "std": std}
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _status(psi: float) -> str:
+        if psi >= DRIFT_PSI_THRESHOLDS["significant"]:
+            return "significant"
+        if psi >= DRIFT_PSI_THRESHOLDS["moderate"]:
+            return "moderate"
+        return "stable"
+
+    @property
+    def has_reference(self) -> bool:
+        return self._reference is not None
+
+    def report(self) -> dict:
+        """Return live statistics and, when possible, PSI / KS drift scores."""
+        count, mean, m2, hist = self._merged()
+        std = np.sqrt(m2 / count) if count else np.zeros_like(mean)
+        ref = self._reference
+        score = ref is not None and count >= DRIFT_MIN_SAMPLES
+
+        features = {}
+        max_psi = 0.0
+        for i, name in enumerate(FEATURE_NAMES):
+            start, stop = self._offsets[i], self._offsets[i] + self._n_bins[i]
+            entry = {
+                "live_mean": round(float(mean[i]), 4),
+                "live_std": round(float(std[i]), 4),
+            }
+            if ref is not None:
+                entry["reference_mean"] = round(float(ref["mean"][i]), 4)
+                entry["reference_std"] = round(float(ref["std"][i]), 4)
+            if score:
+                p = np.maximum(hist[start:stop] / count, _PSI_EPSILON)
+                q_raw = ref["hist"][start:stop]
+                q = np.maximum(q_raw / q_raw.sum(), _PSI_EPSILON)
+                psi = float(np.sum((p - q) * np.log(p / q)))
+                ks = float(np.max(np.abs(np.cumsum(p) - np.cumsum(q))))
+                entry.update(psi=round(psi, 4), ks=round(ks, 4), status=self._status(psi))
+                max_psi = max(max_psi, psi)
+            features[name] = entry
+
+        if ref is None:
+            status = "no_reference"
+        elif not score:
+            status = "insufficient_data"
+        else:
+            status = self._status(max_psi)
+
+        return {
+            "status": status,
+            "samples": int(count),
+            "min_samples": DRIFT_MIN_SAMPLES,
+            "since": self.started_at.isoformat(),
+            "reference": ref["source"] if ref is not None else None,
+            "max_psi": round(max_psi, 4) if score else None,
+            "features": features,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Module-level singleton
+# ---------------------------------------------------------------------------
+monitor = DriftMonitor(get_feature_bounds(), DISCRETE_FEATURES, DRIFT_BINS)
+
+
+def init_reference() -> None:
+    """Load the training distribution as the drift reference (called at startup)."""
+    try:
+        dataset = load_dataset(TRAINING_DATASET)
+        monitor.set_reference(dataset.matrix(FEATURE_NAMES), dataset.weights, TRAINING_DATASET)
+        logger.info(f"Drift reference loaded from '{TRAINING_DATASET}' ({len(dataset)} rows)")
+    except Exception as e:
+        logger.warning(f"Drift reference unavailable — scores disabled: {e}")
+
+
+def record(X: np.ndarray) -> None:
+    """Record the (1, n_features) input row of a prediction request."""
+    monitor.update(X[0])
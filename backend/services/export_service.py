@@ -0,0 +1,171 @@
+"""
+Prediction export service.
+
+Streams stored predictions straight from a MongoDB cursor as NDJSON or
+CSV. Prediction buckets (see prediction_store) are fetched a few at a
+time, unpacked row by row and sent in ~64KB chunks, so memory stays
+constant regardless of export size.
+
+Time-range filters are served by the ``window, _id`` index: a bucket only
+holds predictions from its PREDICTION_BUCKET_SPAN-second window, so the
+buckets that can overlap ``[start, end)`` lie in a bounded ``window``
+range, and rows are then filtered by their own timestamp. Every row carries a ``<bucket _id>:<row>``
+cursor as ``_id``; a client resumes an interrupted export by passing the
+last one it received as ``after``.
+"""
+
+import csv
+import datetime
+import io
+import json
+import time
+from bson import ObjectId
+from pymongo import ASCENDING, ReadPreference
+from services.prediction_store import COLUMNS, bucket_window
+from config import (
+    PREDICTION_BUCKETS_COLLECTION, PREDICTION_BUCKET_SIZE, PREDICTION_BUCKET_SPAN,
+    EXPORT_BATCH_SIZE, EXPORT_MAX_DOCS_PER_SEC, logger,
+)
+
+# Fields a client may request (``_id`` is always included for resumption)
+EXPORT_FIELDS = ["timestamp", "model_version"] + COLUMNS
+
+# Rows are buffered and sent in chunks of about this size: each yielded
+# chunk costs a threadpool hop and an ASGI send, so per-row chunks would
+# compete with live requests for worker threads.
+_CHUNK_BYTES = 64 * 1024
+
+# Time span of one bucket window
+_BUCKET_SPAN = datetime.timedelta(seconds=PREDICTION_BUCKET_SPAN)
+
+
+def to_utc_naive(value: datetime.datetime | None) -> datetime.datetime | None:
+    """Normalise a datetime to naive UTC, the form MongoDB returns."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def parse_cursor(after: str) -> tuple:
+    """Split a ``<bucket _id>:<row>`` resume cursor (raises ValueError)."""
+    bucket_id, _, row = after.partition(":")
+    if not ObjectId.is_valid(bucket_id) or not row.isdigit():
+        raise ValueError(f"Invalid cursor: {after!r}")
+    return ObjectId(bucket_id), int(row)
+
+
+def build_query(start: datetime.datetime | None, end: datetime.datetime | None,
+                resume_from: tuple | None = None) -> dict:
+    """
+    Select the buckets that may hold rows in ``[start, end)`` and, when
+    resuming, sort at or after the ``(window, bucket _id)`` position.
+    """
+    query = {}
+    window_range = {}
+    if start is not None:
+        window_range["$gt"] = start - _BUCKET_SPAN
+    if end is not None:
+        window_range["$lt"] = end
+    if window_range:
+        query["window"] = window_range
+    if resume_from is not None:
+        window, bucket_id = resume_from
+        position = {"$or": [
+            {"window": {"$gt": window}},
+            {"window": window, "_id": {"$gte": bucket_id}},
+        ]}
+        query = {"$and": [query, position]} if query else position
+    return query
+
+
+def resume_position(collection, cursor: tuple) -> tuple:
+    """
+    Return the ``(window, bucket _id)`` sort position of a cursor.
+    A bucket that has since expired resumes from the window it was created in.
+    """
+    bucket_id, _ = cursor
+    doc = collection.find_one({"_id": bucket_id}, {"window": 1})
+    if doc is not None:
+        return doc["window"], bucket_id
+    return bucket_window(bucket_id.generation_time).replace(tzinfo=None), bucket_id
+
+
+def _throttle(sent: int, started: float) -> None:
+    """Sleep just enough to keep the export under EXPORT_MAX_DOCS_PER_SEC."""
+    if EXPORT_MAX_DOCS_PER_SEC <= 0:
+        return
+    ahead = sent / EXPORT_MAX_DOCS_PER_SEC - (time.perf_counter() - started)
+    if ahead > 0:
+        time.sleep(ahead)
+
+
+def stream_predictions(db, start: datetime.datetime | None, end: datetime.datetime | None,
+                       after: tuple | None, fields: list, fmt: str, limit: int | None):
+    """
+    Yield the export body chunk by chunk.
+
+    Reads prefer a secondary when running against a replica set, so large
+    exports stay off the primary serving live writes.
+    """
+    collection = db.get_collection(
+        PREDICTION_BUCKETS_COLLECTION, read_preference=ReadPreference.SECONDARY_PREFERRED
+    )
+    start, end = to_utc_naive(start), to_utc_naive(end)
+    resume_from = resume_position(collection, after) if after is not None else None
+
+    projection = {"window": 1, "ts": 1, "model_version": 1}
+    projection.update({f"columns.{f}": 1 for f in fields if f in COLUMNS})
+    cursor = (
+        collection.find(build_query(start, end, resume_from), projection)
+        .sort([("window", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(max(1, EXPORT_BATCH_SIZE // PREDICTION_BUCKET_SIZE))
+    )
+
+    columns = ["_id"] + fields
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    sent = 0
+    started = time.perf_counter()
+    try:
+        for bucket in cursor:
+            skip_to = after[1] + 1 if after is not None and bucket["_id"] == after[0] else 0
+            values = bucket.get("columns", {})
+            for i in range(skip_to, len(bucket["ts"])):
+                ts = bucket["ts"][i]
+                if (start is not None and ts < start) or (end is not None and ts >= end):
+                    continue
+                row = {
+                    "_id": f"{bucket['_id']}:{i}",
+                    "timestamp": ts.replace(tzinfo=datetime.timezone.utc).isoformat(),
+                    "model_version": bucket.get("model_version"),
+                }
+                for f in fields:
+                    if f in values:
+                        row[f] = values[f][i]
+                if fmt == "csv":
+                    writer.writerow([row.get(c, "") for c in columns])
+                else:
+                    buf.write(json.dumps({c: row.get(c) for c in columns}) + "\n")
+
+                sent += 1
+                if limit and sent >= limit:
+                    break
+                if buf.tell() >= _CHUNK_BYTES:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+                if sent % EXPORT_BATCH_SIZE == 0:
+                    _throttle(sent, started)
+            if limit and sent >= limit:
+                break
+        if buf.tell():
+            yield buf.getvalue()
+    except Exception as e:
+        # Headers are already sent; the client resumes from the last _id it saw
+        logger.error(f"Prediction export aborted after {sent} rows: {e}")
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,165 @@
+"""
+Health check service.
+
+Deep checks (model, SHAP explainer, MongoDB ping, queue depths, recent
+latency percentiles) run on a background thread every
+HEALTH_CHECK_INTERVAL seconds and the result is cached. Liveness and
+readiness probes only read that cached snapshot, so frequent probes cost
+microseconds and never touch MongoDB or the model.
+"""
+
+import datetime
+import threading
+import time
+from collections import deque
+import numpy as np
+from database import get_client
+from services import (
+    job_service, shadow_service, shap_reference, similarity_service,
+)
+from services.admission import bulkheads
+from services.drift_service import monitor as drift_monitor
+from services.model_service import get_model_version, prepare_input
+from services.shap_service import compute_shap, is_warm
+from schemas import HeartInput
+from config import MONGO_URI, HEALTH_CHECK_INTERVAL, HEALTH_LATENCY_WINDOW, logger
+
+# Valid sample input used to warm the SHAP explainer off the request path
+_WARMUP_INPUT = HeartInput(
+    age=55, sex=1, cp=0, trestbps=130, chol=240, fbs=0, restecg=1,
+    thalach=150, exang=0, oldpeak=1.0, slope=1, ca=0, thal=2,
+)
+
+_model = None
+_started = time.time()
+# Recent request latencies in seconds; deque.append is atomic, no lock needed
+_latencies: deque = deque(maxlen=HEALTH_LATENCY_WINDOW)
+_snapshot: dict = {"ready": False, "checked_at": None}
+_checked_monotonic: float | None = None
+
+# Paths kept out of the latency window: health probes, and long-lived
+# streams whose duration reflects export size rather than service health
+_UNTIMED_PREFIXES = ("/api/health", "/api/predictions/export")
+
+
+def record_latency(seconds: float) -> None:
+    """Record one request latency (called by the timing middleware)."""
+    _latencies.append(seconds)
+
+
+class LatencyMiddleware:
+    """
+    Pure ASGI middleware recording each request's latency up to its final
+    ``http.response.body`` message, so streamed responses are timed in full.
+    Paths in ``_UNTIMED_PREFIXES`` are excluded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(_UNTIMED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def timed_send(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record_latency(time.perf_counter() - start)
+
+        await self.app(scope, receive, timed_send)
+
+
+def _check_mongo() -> dict:
+    if not MONGO_URI:
+        return {"configured": False, "ok": None}
+    started = time.perf_counter()
+    try:
+        get_client().admin.command("ping")
+        return {
+            "configured": True,
+            "ok": True,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+    except Exception as e:
+        return {"configured": True, "ok": False, "error": str(e)}
+
+
+def _latency_summary() -> dict:
+    samples = np.array(list(_latencies))
+    if samples.size == 0:
+        return {"window": 0, "p50_ms": None, "p99_ms": None}
+    p50, p99 = np.percentile(samples, [50, 99]) * 1000
+    return {"window": int(samples.size), "p50_ms": round(p50, 2), "p99_ms": round(p99, 2)}
+
+
+def run_checks() -> dict:
+    """Run every deep check once and replace the cached snapshot."""
+    global _snapshot, _checked_monotonic
+
+    model_ok = _model is not None
+    if model_ok and not is_warm(_model):
+        try:
+            compute_shap(_model, prepare_input(_WARMUP_INPUT))
+        except Exception as e:
+            logger.warning(f"Explainer warm-up failed: {e}")
+    explainer_warm = model_ok and is_warm(_model)
+
+    snapshot = {
+        "ready": model_ok and explainer_warm,
+        "checked_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "uptime_s": round(time.time() - _started, 1),
+        "model": {"loaded": model_ok, "version": get_model_version()},
+        "explainer": {"warm": explainer_warm},
+        "mongo": _check_mongo(),
+        "queues": {
+            "jobs": job_service.queue_depth(),
+            "shadow": shadow_service.queue_depth(),
+            "bulkheads_waiting": {name: b.waiting for name, b in bulkheads.items()},
+        },
+        "references": {
+            "drift": drift_monitor.has_reference,
+            "shap": shap_reference.is_ready(),
+            "similarity": similarity_service.is_ready(),
+        },
+        "latency": _latency_summary(),
+    }
+    _snapshot = snapshot
+    _checked_monotonic = time.monotonic()
+    return snapshot
+
+
+def _loop() -> None:
+    while True:
+        try:
+            run_checks()
+        except Exception as e:
+            logger.error(f"Health check failed: {e}")
+        time.sleep(HEALTH_CHECK_INTERVAL)
+
+
+def start(model) -> None:
+    """Start the background checker (called once at startup)."""
+    global _model
+    _model = model
+    threading.Thread(target=_loop, name="health-checker", daemon=True).start()
+
+
+def readiness() -> dict:
+    """
+    Return the cached snapshot. Reports not-ready when the snapshot is
+    older than three intervals, i.e. the checker itself has stalled.
+    """
+    snapshot = dict(_snapshot)
+    if _checked_monotonic is None:
+        snapshot["ready"] = False
+        snapshot["check_age_s"] = None
+        return snapshot
+    age = time.monotonic() - _checked_monotonic
+    snapshot["check_age_s"] = round(age, 2)
+    if age > 3 * HEALTH_CHECK_INTERVAL:
+        snapshot["ready"] = False
+        snapshot["stale"] = True
+    return snapshot
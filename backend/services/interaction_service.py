@@ -0,0 +1,101 @@
+"""
+SHAP interaction service.
+
+Explains pairwise feature interactions (e.g. age x thalach, oldpeak x
+slope) for a patient or cohort. Interaction values cost roughly an order
+of magnitude more than plain SHAP, so:
+
+- results are cached per (model version, input vector);
+- all uncached rows of a request are explained in one vectorised call;
+- explanations run on a copy of the model limited to INTERACTION_THREADS
+  CPU threads, built once per model version;
+- callers run this behind the "interactions" bulkhead so it cannot
+  occupy the threads that serve normal predictions.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+import numpy as np
+from services.shap_service import compute_interactions_batch
+from config import FEATURE_NAMES, INTERACTION_CACHE_SIZE, INTERACTION_THREADS
+
+# Upper-triangle (i < j) index pairs, i.e. every distinct feature pair
+_PAIR_I, _PAIR_J = np.triu_indices(len(FEATURE_NAMES), k=1)
+
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+# (model version, thread-limited model copy)
+_limited: tuple | None = None
+_limited_lock = threading.Lock()
+
+
+def _thread_limited(model, model_version: str):
+    """Return a copy of *model* capped at INTERACTION_THREADS, built once per version."""
+    global _limited
+    with _limited_lock:
+        if _limited is None or _limited[0] != model_version:
+            limited = copy.deepcopy(model)
+            if hasattr(limited, "set_params") and "n_jobs" in limited.get_params():
+                limited.set_params(n_jobs=INTERACTION_THREADS)
+            if hasattr(limited, "get_booster"):
+                # The SHAP explainer calls the booster directly
+                limited.get_booster().set_param({"nthread": INTERACTION_THREADS})
+            _limited = (model_version, limited)
+        return _limited[1]
+
+
+def _summarise(phi: np.ndarray) -> dict:
+    """Rank every feature pair of one row by absolute interaction effect."""
+    # phi[i, j] and phi[j, i] each hold half of the pair's interaction
+    effects = 2.0 * phi[_PAIR_I, _PAIR_J]
+    order = np.argsort(-np.abs(effects), kind="stable")
+    return {
+        "pairs": [
+            {
+                "features": [FEATURE_NAMES[_PAIR_I[k]], FEATURE_NAMES[_PAIR_J[k]]],
+                "interaction": round(float(effects[k]), 6),
+            }
+            for k in order
+        ],
+        "main_effects": {
+            name: round(float(phi[i, i]), 6) for i, name in enumerate(FEATURE_NAMES)
+        },
+    }
+
+
+def top_interactions(model, model_version: str, X: np.ndarray, top_k: int) -> list:
+    """
+    Return, for each row of *X*, its *top_k* strongest feature-pair
+    interactions plus the per-feature main effects.
+    """
+    keys = [(model_version, row.tobytes()) for row in X]
+    summaries: list = [None] * len(X)
+    missing = []
+    with _cache_lock:
+        for i, key in enumerate(keys):
+            cached = _cache.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                _cache.move_to_end(key)
+                summaries[i] = cached
+
+    if missing:
+        # De-duplicate identical rows so each distinct vector is explained once
+        unique_rows, inverse = np.unique(X[missing], axis=0, return_inverse=True)
+        phis = compute_interactions_batch(_thread_limited(model, model_version), unique_rows)
+        fresh = [_summarise(phi) for phi in phis]
+        with _cache_lock:
+            for i, u in zip(missing, np.ravel(inverse)):
+                summaries[i] = fresh[u]
+                _cache[keys[i]] = fresh[u]
+                _cache.move_to_end(keys[i])
+            while len(_cache) > INTERACTION_CACHE_SIZE:
+                _cache.popitem(last=False)
+
+    return [
+        {"top_interactions": s["pairs"][:top_k], "main_effects": s["main_effects"]}
+        for s in summaries
+    ]
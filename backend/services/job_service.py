@@ -0,0 +1,408 @@
+"""
+Background job service.
+
+Runs heavy explanation (SHAP) and PDF report work off the request path:
+endpoints enqueue a job and return its ID immediately, a small worker pool
+drains a bounded in-process queue, and clients poll /api/jobs/{id} for the
+result until it expires.
+
+Job state is kept in SQLite (JOB_SQLITE_PATH) by default, so every
+uvicorn worker on the host can answer status polls for any job and queued
+work survives a restart. Each job is owned by the process that queued or
+is running it, under a lease that process renews while it is alive; jobs
+whose lease has expired (owner crashed or restarted) are taken over by a
+live process. Workers claim a job atomically before running it, so a job
+never runs twice. An empty JOB_SQLITE_PATH selects an in-memory store,
+which only works with a single worker process.
+"""
+
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
+from services.admission import Overloaded
+from services.shap_service import compute_shap
+from services.report_service import generate_pdf
+from services import shap_reference
+from schemas import ReportRequest
+from config import (
+    JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RESULT_TTL, JOB_SQLITE_PATH,
+    ADMISSION_DEADLINE_S, SHAP_REFERENCE_ENABLED, logger,
+)
+
+# Job states
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+# How often workers purge expired jobs (seconds)
+_PURGE_INTERVAL = 30
+# Ownership lease on queued / running jobs, renewed every third of it
+_LEASE_S = 30
+
+# Identifies this process as the owner of the jobs it queues or runs
+_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Messages returned to clients for failed jobs (details are only logged)
+_FAILURE_MESSAGES = {
+    "explain": "Explanation failed",
+    "report": "Report generation failed",
+}
+
+
+# ---------------------------------------------------------------------------
+# Job stores
+# ---------------------------------------------------------------------------
+
+class _MemoryStore:
+    """Job records in a dict; lost on restart."""
+
+    def __init__(self):
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = job
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def claim(self, job_id: str, owner: str, lease_until: float) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != PENDING:
+                return False
+            job.update(status=RUNNING, owner=owner, lease_until=lease_until)
+            return True
+
+    def finish(self, job_id: str, owner: str, **fields) -> None:
+        self.update(job_id, **fields)
+
+    def renew(self, owner: str, lease_until: float) -> None:
+        pass
+
+    def take_orphans(self, owner: str, lease_until: float, now: float, limit: int) -> list:
+        return []
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [k for k, j in self._jobs.items() if j["expires_at"] < now]
+            for k in expired:
+                del self._jobs[k]
+        return len(expired)
+
+
+class _SQLiteStore:
+    """Durable job records; one connection per thread (sqlite3 is not thread-safe)."""
+
+    _COLUMNS = ("id", "type", "status", "payload", "result", "media_type",
+                "error", "created_at", "finished_at", "expires_at", "owner", "lease_until")
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, type TEXT, status TEXT, payload TEXT,"
+                " result BLOB, media_type TEXT, error TEXT,"
+                " created_at REAL, finished_at REAL, expires_at REAL,"
+                " owner TEXT, lease_until REAL)"
+            )
+            # Databases created before job leases existed
+            existing = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (status, lease_until)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _encode(job: dict) -> dict:
+        row = dict(job)
+        row["payload"] = json.dumps(row["payload"])
+        if row.get("result") is not None and row.get("media_type") == "application/json":
+            row["result"] = json.dumps(row["result"])
+        return row
+
+    def create(self, job: dict) -> None:
+        row = self._encode(job)
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in self._COLUMNS)})",
+                [row.get(c) for c in self._COLUMNS],
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        if fields.get("result") is not None and fields.get("media_type") == "application/json":
+            fields["result"] = json.dumps(fields["result"])
+        with self._conn() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                [*fields.values(), job_id],
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        cur = self._conn().execute(
+            f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        if job["result"] is not None and job["media_type"] == "application/json":
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def claim(self, job_id: str, owner: str, lease_until: float) -> bool:
+        """Atomically move a pending job to running; False if another worker got it first."""
+        with self._conn() as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_until = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, owner, lease_until, job_id, PENDING),
+            ).rowcount == 1
+
+    def finish(self, job_id: str, owner: str, **fields) -> None:
+        """Record a job's outcome unless another process has since taken it over."""
+        if fields.get("result") is not None and fields.get("media_type") == "application/json":
+            fields["result"] = json.dumps(fields["result"])
+        with self._conn() as conn:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} "
+                "WHERE id = ? AND owner = ?",
+                [*fields.values(), job_id, owner],
+            )
+
+    def renew(self, owner: str, lease_until: float) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE owner = ? AND status IN (?, ?)",
+                (lease_until, owner, PENDING, RUNNING),
+            )
+
+    def take_orphans(self, owner: str, lease_until: float, now: float, limit: int) -> list:
+        """
+        Take over up to *limit* queued / running jobs whose owner's lease has
+        expired, resetting them to pending. Jobs of live processes are untouched.
+        """
+        conn = self._conn()
+        expired = "status IN (?, ?) AND (lease_until IS NULL OR lease_until < ?)"
+        ids = [r[0] for r in conn.execute(
+            f"SELECT id FROM jobs WHERE {expired} ORDER BY created_at LIMIT ?",
+            (PENDING, RUNNING, now, limit),
+        )]
+        taken = []
+        with conn:
+            for job_id in ids:
+                if conn.execute(
+                    f"UPDATE jobs SET status = ?, owner = ?, lease_until = ? "
+                    f"WHERE id = ? AND {expired}",
+                    (PENDING, owner, lease_until, job_id, PENDING, RUNNING, now),
+                ).rowcount == 1:
+                    taken.append(job_id)
+        return taken
+
+    def purge_expired(self, now: float) -> int:
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,)).rowcount
+
+
+# ---------------------------------------------------------------------------
+# Job handlers: payload -> (result, media_type)
+# ---------------------------------------------------------------------------
+
+_model = None
+
+
+def _run_explain(payload: dict):
+    X = np.array([payload["features"]], dtype=np.float64)
+    result = compute_shap(_model, X)
+    if SHAP_REFERENCE_ENABLED:
+        context = shap_reference.percentiles(result["shap_values"], payload.get("risk_probability"))
+        if context:
+            result.update(context)
+    return result, "application/json"
+
+
+def _run_report(payload: dict):
+    buffer = generate_pdf(ReportRequest(**payload))
+    return buffer.getvalue(), "application/pdf"
+
+
+_HANDLERS = {
+    "explain": _run_explain,
+    "report": _run_report,
+}
+
+
+# ---------------------------------------------------------------------------
+# Queue & workers
+# ---------------------------------------------------------------------------
+
+_store = None
+_queue: queue.Queue = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+_workers: list = []
+_stop = threading.Event()
+
+
+def _worker() -> None:
+    last_purge = time.time()
+    while not _stop.is_set():
+        now = time.time()
+        if now - last_purge > _PURGE_INTERVAL:
+            last_purge = now
+            try:
+                _store.purge_expired(now)
+            except Exception as e:
+                logger.warning(f"Job purge failed: {e}")
+
+        try:
+            job_id = _queue.get(timeout=1)
+        except queue.Empty:
+            continue
+
+        # Expired, or already taken over by another process
+        if not _store.claim(job_id, _OWNER, time.time() + _LEASE_S):
+            continue
+        job = _store.get(job_id)
+        if job is None:
+            continue
+        try:
+            result, media_type = _HANDLERS[job["type"]](job["payload"])
+            finished = time.time()
+            _store.finish(
+                job_id, _OWNER, status=DONE, result=result, media_type=media_type,
+                finished_at=finished, expires_at=finished + JOB_RESULT_TTL,
+            )
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['type']}) failed: {e}")
+            finished = time.time()
+            _store.finish(
+                job_id, _OWNER, status=FAILED,
+                error=_FAILURE_MESSAGES.get(job["type"], "Job failed"),
+                finished_at=finished, expires_at=finished + JOB_RESULT_TTL,
+            )
+
+
+def _recover_orphans() -> int:
+    """Queue jobs left behind by dead processes, as far as the queue has room."""
+    room = JOB_QUEUE_SIZE - _queue.qsize()
+    if room <= 0:
+        return 0
+    now = time.time()
+    taken = _store.take_orphans(_OWNER, now + _LEASE_S, now, room)
+    for job_id in taken:
+        try:
+            _queue.put_nowait(job_id)
+        except queue.Full:
+            break    # lease lapses again, so another process (or we) retry later
+    return len(taken)
+
+
+def _lease_loop() -> None:
+    while not _stop.wait(_LEASE_S / 3):
+        try:
+            _store.renew(_OWNER, time.time() + _LEASE_S)
+            recovered = _recover_orphans()
+            if recovered:
+                logger.info(f"Took over {recovered} orphaned job(s)")
+        except Exception as e:
+            logger.warning(f"Job lease renewal failed: {e}")
+
+
+def start(model) -> None:
+    """Create the job store and worker pool (called once at startup)."""
+    global _model, _store
+    _model = model
+    if JOB_SQLITE_PATH:
+        _store = _SQLiteStore(JOB_SQLITE_PATH)
+    else:
+        _store = _MemoryStore()
+        logger.warning(
+            "JOB_SQLITE_PATH is empty — jobs are kept in process memory, so status "
+            "polls fail under multiple uvicorn workers"
+        )
+
+    requeued = _recover_orphans()
+    if JOB_SQLITE_PATH:
+        threading.Thread(target=_lease_loop, name="job-lease", daemon=True).start()
+
+    for i in range(JOB_WORKERS):
+        t = threading.Thread(target=_worker, name=f"job-worker-{i}", daemon=True)
+        t.start()
+        _workers.append(t)
+    logger.info(
+        f"Job workers started: {JOB_WORKERS} "
+        f"({'sqlite' if JOB_SQLITE_PATH else 'memory'} store, {requeued} re-queued)"
+    )
+
+
+def stop() -> None:
+    """Signal workers to exit (called on shutdown)."""
+    _stop.set()
+
+
+def submit(job_type: str, payload: dict) -> str:
+    """
+    Queue a job and return its ID.
+
+    Raises Overloaded (503) when the queue is full, so bursts fail fast
+    instead of building an unbounded backlog.
+    """
+    now = time.time()
+    job = {
+        "id": uuid.uuid4().hex,
+        "type": job_type,
+        "status": PENDING,
+        "payload": payload,
+        "result": None,
+        "media_type": None,
+        "error": None,
+        "created_at": now,
+        "finished_at": None,
+        # Unstarted jobs expire too, so abandoned work is eventually purged
+        "expires_at": now + JOB_RESULT_TTL,
+        "owner": _OWNER,
+        "lease_until": now + _LEASE_S,
+    }
+    _store.create(job)
+    try:
+        _queue.put_nowait(job["id"])
+    except queue.Full:
+        _store.update(job["id"], status=FAILED, error="Job queue full")
+        raise Overloaded("jobs", ADMISSION_DEADLINE_S)
+    return job["id"]
+
+
+def get(job_id: str) -> dict | None:
+    """Return the job record, or None if unknown or expired."""
+    job = _store.get(job_id)
+    if job is None or job["expires_at"] < time.time():
+        return None
+    return job
+
+
+def queue_depth() -> int:
+    return _queue.qsize()
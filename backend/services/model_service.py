@@ -7,15 +7,31 @@ add versioning later.
 """
 
 import os
+import hashlib
 import pickle
 import joblib
 import numpy as np
 from config import MODEL_PATH, RISK_THRESHOLDS, FEATURE_NAMES, logger
 
 
-def load_model():
+# Content hash of the loaded model file, set by load_model()
+_model_version: str | None = None
+
+
+def get_model_version() -> str | None:
+    """Return a short content hash identifying the loaded model file."""
+    return _model_version
+
+
+def model_file_version(path: str) -> str:
+    """Return a short content hash of the model file at *path*."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def load_model(path: str = MODEL_PATH):
     """
-    Load the pickled ML model.
+    Load the pickled ML model (the primary model unless *path* is given).
 
     Raises
     ------
@@ -25,7 +41,6 @@ def load_model():
         When the file exists but is corrupted / incompatible, or when the
         loaded object is not a valid scikit-learn classifier.
     """
-    path = MODEL_PATH
     if not os.path.exists(path):
         raise FileNotFoundError(
             f"Model file '{path}' not found. Run model/preprocessing_training.py first."
@@ -46,7 +61,12 @@ def load_model():
             f"Loaded object from '{path}' is not a valid classifier "
             "(missing predict_proba)."
         )
-    logger.info(f"Model loaded successfully from '{path}'")
+    version = model_file_version(path)
+    if path == MODEL_PATH:
+        global _model_version
+        _model_version = version
+
+    logger.info(f"Model loaded successfully from '{path}' (version {version})")
     return model
 
 
@@ -78,7 +98,8 @@ def predict(model, data) -> dict:
     2. Get class probability from the model.
     3. Classify into Low / Moderate / High.
 
-    Returns a dict with risk_probability and risk_level.
+    Returns a dict with risk_probability (rounded), the unrounded
+    probability and risk_level.
     """
     X = prepare_input(data)
     risk_prob = float(model.predict_proba(X)[0][1])
@@ -87,5 +108,6 @@ def predict(model, data) -> dict:
     return {
         "X": X,
         "risk_probability": round(risk_prob, 2),
+        "probability": risk_prob,
         "risk_level": risk_level,
     }
@@ -0,0 +1,132 @@
+"""
+Prediction storage service.
+
+Persists /api/predict results to MongoDB in compact, time-bucketed form
+(the MongoDB bucket pattern) instead of one document per prediction.
+
+Each prediction is appended synchronously on the request path to the open
+bucket of its time window with a single upsert: the bucket for
+(window, model version) that still has fewer than PREDICTION_BUCKET_SIZE
+rows is extended in place, or a new one is created. Nothing is buffered
+in process memory, so a crash loses no acknowledged prediction, while
+field names and index entries are still stored once per bucket rather
+than once per prediction.
+
+Bucket layout (columnar)::
+
+    {
+        "_id": ObjectId,
+        "model_version": "94adc00db3f2",
+        "window": <datetime>,   # start of the PREDICTION_BUCKET_SPAN window; drives TTL
+        "count": 200,
+        "ts": [<datetime>, ...],
+        "columns": {"age": [...], ..., "risk_probability": [...], "risk_level": [...]},
+    }
+
+Indexes and the TTL are created at startup by database.init_prediction_indexes().
+Predictions stored by older versions in the flat PREDICTIONS_COLLECTION
+are moved into buckets with:
+    python -m services.prediction_store --migrate
+"""
+
+import datetime
+import sys
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from database import get_db_connection
+from services.model_service import get_model_version
+from config import (
+    FEATURE_NAMES, PREDICTIONS_COLLECTION, PREDICTION_BUCKETS_COLLECTION,
+    PREDICTION_BUCKET_SIZE, PREDICTION_BUCKET_SPAN, logger,
+)
+
+# Columns stored per prediction, in addition to the timestamp
+COLUMNS = FEATURE_NAMES + ["risk_probability", "risk_level"]
+
+# Server error code for a duplicate _id (a bucket already migrated)
+_DUPLICATE_KEY = 11000
+
+
+def bucket_window(ts: datetime.datetime) -> datetime.datetime:
+    """Start of the PREDICTION_BUCKET_SPAN-second window containing *ts*."""
+    start = int(ts.timestamp()) // PREDICTION_BUCKET_SPAN * PREDICTION_BUCKET_SPAN
+    return datetime.datetime.fromtimestamp(start, tz=datetime.timezone.utc)
+
+
+def record(db, data, risk_probability: float, risk_level: str) -> None:
+    """Append one prediction (a HeartInput plus its result) to its open bucket."""
+    ts = datetime.datetime.now(datetime.timezone.utc)
+    values = [getattr(data, f) for f in FEATURE_NAMES] + [risk_probability, risk_level]
+    db[PREDICTION_BUCKETS_COLLECTION].update_one(
+        {
+            "window": bucket_window(ts),
+            "model_version": get_model_version(),
+            "count": {"$lt": PREDICTION_BUCKET_SIZE},
+        },
+        {
+            "$push": {"ts": ts, **{f"columns.{c}": v for c, v in zip(COLUMNS, values)}},
+            "$inc": {"count": 1},
+        },
+        upsert=True,
+    )
+
+
+def make_bucket(rows: list, model_version: str | None) -> dict:
+    """Build one bucket document from (timestamp, values) rows of a single window."""
+    return {
+        "model_version": model_version,
+        "window": bucket_window(rows[0][0]),
+        "count": len(rows),
+        "ts": [ts for ts, _ in rows],
+        "columns": {
+            name: [values[i] for _, values in rows] for i, name in enumerate(COLUMNS)
+        },
+    }
+
+
+def migrate_legacy(db) -> int:
+    """
+    Move flat documents from PREDICTIONS_COLLECTION into buckets.
+
+    Documents are processed oldest first, PREDICTION_BUCKET_SIZE at a time,
+    and each bucket takes the ``_id`` of its first legacy document, so an
+    interrupted migration can simply be re-run. The prediction time is
+    taken from the ObjectId (second precision); the model version is unknown.
+    """
+    legacy = db[PREDICTIONS_COLLECTION]
+    buckets = db[PREDICTION_BUCKETS_COLLECTION]
+    migrated = 0
+    while True:
+        docs = list(legacy.find().sort("_id", ASCENDING).limit(PREDICTION_BUCKET_SIZE))
+        if not docs:
+            return migrated
+
+        groups: dict = {}
+        for doc in docs:
+            ts = doc["_id"].generation_time
+            groups.setdefault(bucket_window(ts), []).append(
+                (doc["_id"], (ts, [doc.get(c) for c in COLUMNS]))
+            )
+        new_buckets = []
+        for rows in groups.values():
+            bucket = make_bucket([row for _, row in rows], None)
+            bucket["_id"] = rows[0][0]
+            new_buckets.append(bucket)
+
+        try:
+            buckets.insert_many(new_buckets, ordered=False)
+        except BulkWriteError as e:
+            if any(err["code"] != _DUPLICATE_KEY for err in e.details["writeErrors"]):
+                raise
+        legacy.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        migrated += len(docs)
+        logger.info(f"Migrated {migrated} legacy predictions")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["--migrate"]:
+        sys.exit("Usage: python -m services.prediction_store --migrate")
+    with get_db_connection() as database:
+        n = migrate_legacy(database)
+    print(f"Migrated {n} predictions from '{PREDICTIONS_COLLECTION}' "
+          f"to '{PREDICTION_BUCKETS_COLLECTION}'")
@@ -0,0 +1,176 @@
+"""
+Shadow model evaluation service.
+
+Scores a sampled fraction of live /api/predict inputs with candidate
+models (SHADOW_MODEL_PATHS) so a retrained model can be compared with the
+primary on real traffic before it is promoted.
+
+Nothing runs on the request path beyond a sampling check and a
+non-blocking put after the response is sent. Inputs are queued with the
+primary model's already-computed probability, so only candidates are
+scored off-path. A single background worker scores queued inputs in
+batches and is duty-cycled to at most
+SHADOW_MAX_CPU_FRACTION of one core; when it falls behind, the bounded
+queue fills and new samples are dropped instead of waiting.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+import numpy as np
+from services.model_service import load_model, model_file_version, classify_risk
+from config import (
+    SHADOW_MODEL_PATHS, SHADOW_SAMPLE_RATE, SHADOW_QUEUE_SIZE,
+    SHADOW_BATCH_SIZE, SHADOW_MAX_CPU_FRACTION, logger,
+)
+
+_queue: queue.Queue = queue.Queue(maxsize=SHADOW_QUEUE_SIZE)
+_candidates: dict = {}         # {name: model}
+_stats_lock = threading.Lock()
+_counters = {"sampled": 0, "dropped": 0, "scored": 0, "batches": 0, "busy_s": 0.0}
+_metrics: dict = {}            # {name: per-candidate running sums}
+
+
+def _new_metrics(path: str, version: str) -> dict:
+    return {
+        "path": path,
+        "version": version,
+        "n": 0,
+        "label_agreements": 0,
+        "sum_delta": 0.0,
+        "sum_abs_delta": 0.0,
+        "max_abs_delta": 0.0,
+        "risk_level_flips": {},     # {"Low->High": count}
+    }
+
+
+def start() -> None:
+    """Load candidate models and start the shadow worker (no-op when none configured)."""
+    if not SHADOW_MODEL_PATHS:
+        return
+    if not 0 < SHADOW_MAX_CPU_FRACTION <= 1:
+        logger.error(
+            f"SHADOW_MAX_CPU_FRACTION must be in (0, 1], got {SHADOW_MAX_CPU_FRACTION} "
+            "— shadow evaluation disabled"
+        )
+        return
+
+    for path in SHADOW_MODEL_PATHS:
+        try:
+            model = load_model(path)
+        except (FileNotFoundError, RuntimeError) as e:
+            logger.warning(f"Shadow model '{path}' skipped: {e}")
+            continue
+        # Keep candidate inference single-threaded so it can't fan out across cores
+        if hasattr(model, "set_params") and "n_jobs" in model.get_params():
+            model.set_params(n_jobs=1)
+        name = os.path.basename(path)
+        _candidates[name] = model
+        _metrics[name] = _new_metrics(path, model_file_version(path))
+
+    if _candidates:
+        threading.Thread(target=_worker, name="shadow-worker", daemon=True).start()
+        logger.info(f"Shadow evaluation enabled for: {', '.join(_candidates)}")
+
+
+def sample() -> bool:
+    """Decide on the request path whether this prediction is shadow-scored."""
+    return bool(_candidates) and random.random() < SHADOW_SAMPLE_RATE
+
+
+def submit(X: np.ndarray, primary_probability: float) -> None:
+    """
+    Queue a sampled (1, n_features) input row with the primary model's
+    unrounded probability. Meant to run as a background task after the
+    response has been sent.
+    """
+    try:
+        _queue.put_nowait((X[0], primary_probability))
+        with _stats_lock:
+            _counters["sampled"] += 1
+    except queue.Full:
+        with _stats_lock:
+            _counters["dropped"] += 1
+
+
+def _next_batch():
+    items = [_queue.get()]
+    while len(items) < SHADOW_BATCH_SIZE:
+        try:
+            items.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    rows, primary = zip(*items)
+    return np.vstack(rows), np.array(primary)
+
+
+def _record(name: str, primary: np.ndarray, candidate: np.ndarray) -> None:
+    delta = candidate - primary
+    abs_delta = np.abs(delta)
+    m = _metrics[name]
+    m["n"] += len(delta)
+    m["label_agreements"] += int(np.sum((primary >= 0.5) == (candidate >= 0.5)))
+    m["sum_delta"] += float(delta.sum())
+    m["sum_abs_delta"] += float(abs_delta.sum())
+    m["max_abs_delta"] = max(m["max_abs_delta"], float(abs_delta.max()))
+    for p, c in zip(primary, candidate):
+        before, after = classify_risk(p), classify_risk(c)
+        if before != after:
+            key = f"{before}->{after}"
+            m["risk_level_flips"][key] = m["risk_level_flips"].get(key, 0) + 1
+
+
+def _worker() -> None:
+    while True:
+        X, primary = _next_batch()
+        started = time.perf_counter()
+        try:
+            scored = {name: model.predict_proba(X)[:, 1] for name, model in _candidates.items()}
+            with _stats_lock:
+                for name, probs in scored.items():
+                    _record(name, primary, probs)
+                _counters["scored"] += len(X)
+                _counters["batches"] += 1
+        except Exception as e:
+            logger.error(f"Shadow scoring failed for batch of {len(X)}: {e}")
+        busy = time.perf_counter() - started
+
+        # Duty-cycle: idle long enough that busy time stays under the CPU cap
+        with _stats_lock:
+            _counters["busy_s"] += busy
+        time.sleep(busy * (1 - SHADOW_MAX_CPU_FRACTION) / SHADOW_MAX_CPU_FRACTION)
+
+
+def queue_depth() -> int:
+    return _queue.qsize()
+
+
+def stats() -> dict:
+    """Agreement rate, probability deltas and risk-level flips per candidate."""
+    with _stats_lock:
+        candidates = {}
+        for name, m in _metrics.items():
+            n = m["n"]
+            flips = sum(m["risk_level_flips"].values())
+            candidates[name] = {
+                "path": m["path"],
+                "version": m["version"],
+                "samples": n,
+                "label_agreement_rate": round(m["label_agreements"] / n, 4) if n else None,
+                "mean_delta": round(m["sum_delta"] / n, 4) if n else None,
+                "mean_abs_delta": round(m["sum_abs_delta"] / n, 4) if n else None,
+                "max_abs_delta": round(m["max_abs_delta"], 4),
+                "risk_level_flip_rate": round(flips / n, 4) if n else None,
+                "risk_level_flips": dict(m["risk_level_flips"]),
+            }
+        return {
+            "enabled": bool(_candidates),
+            "sample_rate": SHADOW_SAMPLE_RATE,
+            "max_cpu_fraction": SHADOW_MAX_CPU_FRACTION,
+            "queue_depth": queue_depth(),
+            "queue_size": SHADOW_QUEUE_SIZE,
+            **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in _counters.items()},
+            "candidates": candidates,
+        }
@@ -0,0 +1,179 @@
+"""
+Reference SHAP distribution service.
+
+Explains every row of the training dataset once per model version and
+stores the result as memory-mapped matrices with each feature's SHAP
+column pre-sorted. A single patient's contributions can then be placed
+in population context ("cholesterol contribution is at the 83rd
+percentile") with one binary search per feature instead of re-explaining
+the dataset per request.
+
+The reference is rebuilt automatically when the model file or the
+training data changes. Build it offline from the backend directory with:
+    python -m services.shap_reference
+"""
+
+import os
+import threading
+import numpy as np
+from services.dataset_cache import (
+    load_dataset, save_array, save_json, build_lock, load_or_build,
+)
+from services.shap_service import compute_shap_batch
+from config import FEATURE_NAMES, TRAINING_DATASET, SHAP_REFERENCE_DIR, logger
+
+_MANIFEST_NAME = "manifest.json"
+
+# Currently loaded reference (arrays are memory-mapped, read-only)
+_reference: dict | None = None
+_lock = threading.Lock()
+
+
+def _reference_dir(model_version: str) -> str:
+    return os.path.join(SHAP_REFERENCE_DIR, model_version)
+
+
+def build_reference(model, model_version: str) -> dict:
+    """
+    Explain every training row with *model* and persist the sorted reference.
+
+    Files written (arrays first, manifest last):
+        shap.npy            – (n_rows, n_features) SHAP values, row-aligned
+        predictions.npy     – (n_rows,) predicted probability
+        weights.npy         – (n_rows,) duplicate counts from the dataset cache
+        sorted_shap.npy     – (n_features, n_rows) each feature's SHAP column sorted
+        sorted_cumw.npy     – (n_features, n_rows + 1) cumulative weights in sorted order
+        sorted_pred.npy     – (n_rows,) predictions sorted
+        sorted_pred_cumw.npy– (n_rows + 1,) cumulative weights of sorted predictions
+    """
+    dataset = load_dataset(TRAINING_DATASET)
+    X = dataset.matrix(FEATURE_NAMES)
+    weights = np.asarray(dataset.weights, dtype=np.float64)
+
+    shap_matrix, base_value = compute_shap_batch(model, X)
+    shap_matrix = np.asarray(shap_matrix, dtype=np.float64)
+    predictions = model.predict_proba(X)[:, 1].astype(np.float64)
+
+    order = np.argsort(shap_matrix, axis=0, kind="stable").T          # (F, n)
+    sorted_shap = np.take_along_axis(shap_matrix.T, order, axis=1)
+    sorted_cumw = np.concatenate(
+        [np.zeros((len(FEATURE_NAMES), 1)), np.cumsum(weights[order], axis=1)], axis=1
+    )
+    pred_order = np.argsort(predictions, kind="stable")
+    sorted_pred = predictions[pred_order]
+    sorted_pred_cumw = np.concatenate([[0.0], np.cumsum(weights[pred_order])])
+
+    out_dir = _reference_dir(model_version)
+    os.makedirs(out_dir, exist_ok=True)
+    save_array(out_dir, "shap", shap_matrix)
+    save_array(out_dir, "predictions", predictions)
+    save_array(out_dir, "weights", weights)
+    save_array(out_dir, "sorted_shap", np.ascontiguousarray(sorted_shap))
+    save_array(out_dir, "sorted_cumw", np.ascontiguousarray(sorted_cumw))
+    save_array(out_dir, "sorted_pred", sorted_pred)
+    save_array(out_dir, "sorted_pred_cumw", sorted_pred_cumw)
+
+    manifest = {
+        "model_version": model_version,
+        "dataset": TRAINING_DATASET,
+        "dataset_sha256": dataset.source_sha256,
+        "n_rows": len(dataset),
+        "n_source_rows": dataset.n_source_rows,
+        "base_value": base_value,
+        "features": FEATURE_NAMES,
+    }
+    save_json(out_dir, _MANIFEST_NAME, manifest)
+
+    logger.info(
+        f"SHAP reference built for model {model_version}: {len(dataset)} rows explained"
+    )
+    return manifest
+
+
+def _open_reference(model_version: str, manifest: dict) -> dict:
+    out_dir = _reference_dir(model_version)
+    # np.asarray drops the memmap subclass (still zero-copy) so per-request
+    # slicing doesn't pay memmap bookkeeping overhead.
+    arrays = {
+        name: np.asarray(np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r"))
+        for name in ("sorted_shap", "sorted_cumw", "sorted_pred", "sorted_pred_cumw")
+    }
+    return {**arrays, "manifest": manifest}
+
+
+def _is_stale(manifest: dict | None, dataset) -> bool:
+    return (
+        manifest is None
+        or manifest.get("features") != FEATURE_NAMES
+        or manifest.get("dataset_sha256") != dataset.source_sha256
+    )
+
+
+def init_reference(model, model_version: str) -> None:
+    """
+    Load the reference for *model_version*, (re)building it when it is
+    missing, built for another feature set, or built from older data.
+    """
+    global _reference
+    try:
+        dataset = load_dataset(TRAINING_DATASET)
+        manifest = load_or_build(
+            _reference_dir(model_version), _MANIFEST_NAME,
+            lambda m: _is_stale(m, dataset),
+            lambda: build_reference(model, model_version),
+        )
+
+        with _lock:
+            _reference = _open_reference(model_version, manifest)
+        logger.info(f"SHAP reference loaded for model {model_version}")
+    except Exception as e:
+        logger.warning(f"SHAP reference unavailable — percentiles disabled: {e}")
+
+
+def is_ready() -> bool:
+    return _reference is not None
+
+
+def _weighted_percentile(sorted_values, cumw, value: float) -> float:
+    """Mid-rank percentile of *value* within a weighted, sorted sample."""
+    lo = np.searchsorted(sorted_values, value, side="left")
+    hi = np.searchsorted(sorted_values, value, side="right")
+    return float(50.0 * (cumw[lo] + cumw[hi]) / cumw[-1])
+
+
+def percentiles(shap_values: dict, risk_probability: float | None = None) -> dict | None:
+    """
+    Place a single explanation within the reference population.
+
+    Returns
+    -------
+    None when no reference is loaded, otherwise a dict with keys:
+        shap_percentiles – {feature_name: percentile 0-100}
+        risk_percentile  – percentile of *risk_probability* (if given)
+    """
+    ref = _reference
+    if ref is None:
+        return None
+
+    sorted_shap, sorted_cumw = ref["sorted_shap"], ref["sorted_cumw"]
+    result = {
+        "shap_percentiles": {
+            name: round(_weighted_percentile(sorted_shap[i], sorted_cumw[i], shap_values[name]), 1)
+            for i, name in enumerate(FEATURE_NAMES)
+        }
+    }
+    if risk_probability is not None:
+        result["risk_percentile"] = round(
+            _weighted_percentile(ref["sorted_pred"], ref["sorted_pred_cumw"], risk_probability), 1
+        )
+    return result
+
+
+if __name__ == "__main__":
+    from services.model_service import load_model, get_model_version
+
+    loaded = load_model()
+    with build_lock(_reference_dir(get_model_version())):
+        m = build_reference(loaded, get_model_version())
+    print(f"SHAP reference for model {m['model_version']}: {m['n_rows']} rows "
+          f"from {m['dataset']}")
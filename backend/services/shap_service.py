@@ -23,6 +23,11 @@ def get_explainer(model):
     return _explainer_cache[model_id]
 
 
+def is_warm(model) -> bool:
+    """True once an explainer for *model* has been built."""
+    return id(model) in _explainer_cache
+
+
 # ---------------------------------------------------------------------------
 # Robust SHAP value extractors (FIX-5)
 # ---------------------------------------------------------------------------
@@ -55,6 +60,21 @@ def _extract_shap_vector(shap_values, class_index: int = 1) -> np.ndarray:
     return sv
 
 
+def _extract_shap_matrix(shap_values, class_index: int = 1) -> np.ndarray:
+    """
+    Batch counterpart of _extract_shap_vector: return the SHAP values of
+    every row as an (n_samples, n_features) array, whatever the SHAP format.
+    """
+    if isinstance(shap_values, list):
+        return np.asarray(shap_values[class_index])
+    vals = shap_values if isinstance(shap_values, np.ndarray) else shap_values.values
+    if vals.ndim == 3:                     # (n_samples, n_features, n_classes)
+        return vals[:, :, class_index]
+    if vals.ndim == 1:
+        return vals[np.newaxis, :]
+    return vals
+
+
 def _extract_base_value(base_value, class_index: int = 1) -> float:
     """Safely extract a scalar base value from any SHAP expected_value format."""
     if isinstance(base_value, (list, np.ndarray)):
@@ -98,3 +118,35 @@ def compute_shap(model, X: np.ndarray) -> dict:
         "top_risk_factors": top_risk_factors,
         "base_value": float(base_value),
     }
+
+
+def compute_interactions_batch(model, X: np.ndarray) -> np.ndarray:
+    """
+    Compute SHAP interaction values for every row of *X* in one call.
+
+    Returns an (n_samples, n_features, n_features) array for the positive
+    class; off-diagonal [i, j] holds half the i x j interaction effect.
+    """
+    explainer = get_explainer(model)
+    values = explainer.shap_interaction_values(X)
+    if isinstance(values, list):
+        values = values[1]
+    values = np.asarray(values)
+    if values.ndim == 4:                   # (n_samples, F, F, n_classes)
+        values = values[..., 1]
+    return values
+
+
+def compute_shap_batch(model, X: np.ndarray) -> tuple:
+    """
+    Compute SHAP values for every row of *X* in a single explainer call.
+
+    Returns
+    -------
+    (shap_matrix, base_value) where shap_matrix has shape
+    (n_samples, n_features) in FEATURE_NAMES order.
+    """
+    explainer = get_explainer(model)
+    shap_matrix = _extract_shap_matrix(explainer.shap_values(X), class_index=1)
+    base_value = _extract_base_value(explainer.expected_value, class_index=1)
+    return shap_matrix, float(base_value)
@@ -0,0 +1,178 @@
+"""
+Similar-patient lookup service.
+
+Finds the k historical cases most similar to a patient, with their
+outcomes, as supporting context for a prediction.
+
+Features are min-max scaled by the HeartInput bounds so every feature
+contributes on the same 0-1 scale. The scaled reference matrix and its
+squared row norms are persisted as ``.npy`` files and memory-mapped.
+Queries compute exact squared Euclidean distances block by block
+(|q|^2 + |x|^2 - 2 q.x, one matrix product per block) and keep a running
+top-k, so a batch of queries costs one pass over the reference data and
+memory stays bounded as the reference set grows.
+
+The index rebuilds automatically when the reference dataset changes.
+Rebuild manually from the backend directory with:
+    python -m services.similarity_service
+"""
+
+import os
+import threading
+import numpy as np
+from schemas import get_feature_bounds
+from services.dataset_cache import (
+    load_dataset, save_array, save_json, build_lock, load_or_build,
+)
+from config import FEATURE_NAMES, SIMILARITY_DATASET, SIMILARITY_INDEX_DIR, logger
+
+_MANIFEST_NAME = "manifest.json"
+# Reference rows scored per matrix product
+_BLOCK_ROWS = 65536
+
+_BOUNDS = get_feature_bounds()
+_LO = np.array([_BOUNDS[f][0] for f in FEATURE_NAMES], dtype=np.float32)
+_SPAN = np.array([_BOUNDS[f][1] - _BOUNDS[f][0] for f in FEATURE_NAMES], dtype=np.float32)
+
+# Currently loaded index
+_index: dict | None = None
+_lock = threading.Lock()
+
+
+def _scale(X: np.ndarray) -> np.ndarray:
+    return ((np.asarray(X, dtype=np.float32) - _LO) / _SPAN).astype(np.float32)
+
+
+def build_index() -> dict:
+    """Scale the reference dataset and persist the search matrices."""
+    dataset = load_dataset(SIMILARITY_DATASET)
+    scaled = np.ascontiguousarray(_scale(dataset.matrix(FEATURE_NAMES)))
+    sqnorm = np.einsum("ij,ij->i", scaled, scaled)
+
+    os.makedirs(SIMILARITY_INDEX_DIR, exist_ok=True)
+    save_array(SIMILARITY_INDEX_DIR, "scaled", scaled)
+    save_array(SIMILARITY_INDEX_DIR, "sqnorm", sqnorm)
+
+    manifest = {
+        "dataset": SIMILARITY_DATASET,
+        "dataset_sha256": dataset.source_sha256,
+        "n_rows": len(dataset),
+        "features": FEATURE_NAMES,
+        "bounds": [list(_BOUNDS[f]) for f in FEATURE_NAMES],
+    }
+    save_json(SIMILARITY_INDEX_DIR, _MANIFEST_NAME, manifest)
+    logger.info(f"Similarity index built from '{SIMILARITY_DATASET}' ({len(dataset)} rows)")
+    return manifest
+
+
+def _is_stale(manifest: dict | None, dataset) -> bool:
+    return (
+        manifest is None
+        or manifest.get("dataset") != SIMILARITY_DATASET
+        or manifest.get("dataset_sha256") != dataset.source_sha256
+        or manifest.get("features") != FEATURE_NAMES
+        or manifest.get("bounds") != [list(_BOUNDS[f]) for f in FEATURE_NAMES]
+    )
+
+
+def init_index() -> None:
+    """Load the index, rebuilding it if the dataset or scaling changed (called at startup)."""
+    global _index
+    try:
+        dataset = load_dataset(SIMILARITY_DATASET)
+        manifest = load_or_build(
+            SIMILARITY_INDEX_DIR, _MANIFEST_NAME,
+            lambda m: _is_stale(m, dataset), build_index,
+        )
+
+        loaded = {
+            "scaled": np.asarray(np.load(
+                os.path.join(SIMILARITY_INDEX_DIR, "scaled.npy"), mmap_mode="r")),
+            "sqnorm": np.asarray(np.load(
+                os.path.join(SIMILARITY_INDEX_DIR, "sqnorm.npy"), mmap_mode="r")),
+            "dataset": dataset,
+            "manifest": manifest,
+        }
+        with _lock:
+            _index = loaded
+        logger.info(f"Similarity index loaded ({manifest['n_rows']} reference rows)")
+    except Exception as e:
+        logger.warning(f"Similarity index unavailable: {e}")
+
+
+def is_ready() -> bool:
+    return _index is not None
+
+
+def _search(index: dict, X: np.ndarray, k: int):
+    """Return (row indices, squared distances), each (n_queries, k), nearest first."""
+    scaled, sqnorm = index["scaled"], index["sqnorm"]
+    n = scaled.shape[0]
+    k = min(k, n)
+    Q = _scale(X)
+    q_norm = np.einsum("ij,ij->i", Q, Q)[:, None]
+
+    best_d = np.full((len(Q), 0), np.inf, dtype=np.float32)
+    best_i = np.empty((len(Q), 0), dtype=np.int64)
+    for start in range(0, n, _BLOCK_ROWS):
+        block = scaled[start:start + _BLOCK_ROWS]
+        d = q_norm + sqnorm[start:start + _BLOCK_ROWS] - 2.0 * (Q @ block.T)
+        idx = np.broadcast_to(np.arange(start, start + len(block)), d.shape)
+        cand_d = np.concatenate([best_d, d], axis=1)
+        cand_i = np.concatenate([best_i, idx], axis=1)
+        if cand_d.shape[1] > k:
+            part = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            cand_d = np.take_along_axis(cand_d, part, axis=1)
+            cand_i = np.take_along_axis(cand_i, part, axis=1)
+        best_d, best_i = cand_d, cand_i
+
+    order = np.argsort(best_d, axis=1, kind="stable")
+    best_d = np.maximum(np.take_along_axis(best_d, order, axis=1), 0.0)
+    return np.take_along_axis(best_i, order, axis=1), best_d
+
+
+def find_similar(X: np.ndarray, k: int) -> list | None:
+    """
+    Look up the *k* nearest historical cases for each row of *X*.
+
+    Returns
+    -------
+    None when no index is loaded, otherwise one dict per query row:
+        neighbours   – [{features, target, occurrences, distance}], nearest first
+        outcome_rate – share of neighbouring cases (by occurrence) with target = 1
+    """
+    index = _index
+    if index is None:
+        return None
+
+    rows, sq_dist = _search(index, X, k)
+    columns = index["dataset"].columns
+    weights = index["dataset"].weights
+    target = columns.get("target")
+
+    results = []
+    for q_rows, q_dist in zip(rows, sq_dist):
+        neighbours = []
+        positive = total = 0
+        for r, d in zip(q_rows, q_dist):
+            w = int(weights[r])
+            outcome = int(target[r]) if target is not None else None
+            neighbours.append({
+                "features": {f: columns[f][r].item() for f in FEATURE_NAMES},
+                "target": outcome,
+                "occurrences": w,
+                "distance": round(float(np.sqrt(d)), 4),
+            })
+            total += w
+            positive += w if outcome == 1 else 0
+        results.append({
+            "neighbours": neighbours,
+            "outcome_rate": round(positive / total, 4) if total and target is not None else None,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    with build_lock(SIMILARITY_INDEX_DIR):
+        m = build_index()
+    print(f"Similarity index: {m['n_rows']} rows from {m['dataset']}")
@@ -0,0 +1,105 @@
+"""
+What-if sweep service.
+
+Answers "how would the risk change if <feature> were different?" by
+sweeping one or two features across their valid HeartInput range while
+holding the rest of the patient's vector fixed. The whole grid is built
+as one matrix and scored (and optionally explained) in a single batched
+model / SHAP call instead of one request per grid point.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from schemas import get_feature_bounds
+from services.model_service import classify_risk
+from services.shap_service import compute_shap_batch
+from config import FEATURE_NAMES, DISCRETE_FEATURES, WHATIF_CACHE_SIZE
+
+_BOUNDS = get_feature_bounds()
+
+# LRU cache of finished sweeps keyed by (model, base vector, sweep params)
+_cache: OrderedDict = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _axis_values(feature: str, steps: int) -> np.ndarray:
+    """Grid values for *feature*: every valid value if discrete, else *steps* points."""
+    lo, hi = _BOUNDS[feature]
+    if feature in DISCRETE_FEATURES:
+        return np.arange(lo, hi + 1)
+    values = np.linspace(lo, hi, steps)
+    # Keep values representable by the schema (integers, or 0.1 for oldpeak)
+    decimals = 1 if feature == "oldpeak" else 0
+    return np.unique(np.round(values, decimals))
+
+
+def _build_grid(base_X: np.ndarray, features: list, steps: int):
+    """Return (axes, grid) where grid is (n_points, n_features) in FEATURE_NAMES order."""
+    axes = [_axis_values(f, steps) for f in features]
+    mesh = np.meshgrid(*axes, indexing="ij")
+    grid = np.repeat(base_X, mesh[0].size, axis=0)
+    for feature, values in zip(features, mesh):
+        grid[:, FEATURE_NAMES.index(feature)] = values.ravel()
+    return axes, grid
+
+
+def _get_cached(key):
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _put_cached(key, result) -> None:
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > WHATIF_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def risk_sweep(model, base_X: np.ndarray, features: list, steps: int,
+               include_shap: bool = False) -> dict:
+    """
+    Score a 1-D risk curve or 2-D risk surface around *base_X*.
+
+    Returns
+    -------
+    dict with keys:
+        features          – the swept feature names
+        axes              – {feature: grid values}
+        risk_probability  – probabilities shaped like the grid (list / nested list)
+        risk_level        – matching Low / Moderate / High labels
+        shap_values       – {feature: values shaped like the grid}  (if requested)
+        base_value        – the explainer's expected value            (if requested)
+    """
+    key = (id(model), base_X.tobytes(), tuple(features), steps, include_shap)
+    cached = _get_cached(key)
+    if cached is not None:
+        return cached
+
+    axes, grid = _build_grid(base_X, features, steps)
+    shape = tuple(len(a) for a in axes)
+
+    probs = model.predict_proba(grid)[:, 1].astype(np.float64)
+    levels = np.array([classify_risk(p) for p in probs], dtype=object)
+
+    result = {
+        "features": list(features),
+        "axes": {f: a.tolist() for f, a in zip(features, axes)},
+        "risk_probability": np.round(probs, 4).reshape(shape).tolist(),
+        "risk_level": levels.reshape(shape).tolist(),
+    }
+
+    if include_shap:
+        shap_matrix, base_value = compute_shap_batch(model, grid)
+        result["shap_values"] = {
+            name: np.round(shap_matrix[:, i].astype(np.float64), 6).reshape(shape).tolist()
+            for i, name in enumerate(FEATURE_NAMES)
+        }
+        result["base_value"] = base_value
+
+    _put_cached(key, result)
+    return result
@@ -0,0 +1,405 @@
+"""
+Load-test harness for the Heart Disease Prediction API.
+
+Replays patient rows from dataset/heart.csv against /api/token,
+/api/predict and /api/report and reports throughput, latency percentiles,
+error rates and the latency-vs-concurrency knee, so worker counts and
+batching settings can be compared run to run.
+
+Two load models are supported:
+  closed loop  – N concurrent clients, each sending its next request as
+                 soon as the previous one returns (--concurrency 1,4,16)
+  open loop    – Poisson arrivals at a fixed rate regardless of response
+                 times (--rate 20,50); latency is measured from the
+                 scheduled send time, so queueing delay is not hidden.
+
+/api/token is rate-limited per client IP (10 calls/minute), so token load
+is opt-in (e.g. --mix predict=8,report=1,token=1). Its 429s are expected
+rate limiting, not overload: they are reported under "token" but left
+out of the "all" aggregate and the knee.
+
+By default a local uvicorn is started from ../backend with MongoDB
+disabled (MONGO_URI unset); pass --mongo-uri to test against a real or
+containerised instance, or --url to target an already running server.
+
+Usage (from this directory):
+    python loadtest.py --concurrency 1,2,4,8,16 --duration 10
+    python loadtest.py --rate 10,25,50 --workers 2 --json run_2w.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+sys.path.insert(0, BACKEND_DIR)
+from services.dataset_cache import load_dataset  # noqa: E402
+from schemas import get_feature_bounds  # noqa: E402
+from config import FEATURE_NAMES, API_KEY_VALUE  # noqa: E402
+
+ENDPOINTS = ("token", "predict", "report")
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+def load_patients(name: str) -> tuple:
+    """Return (rows, sampling probabilities) with values clipped to the API bounds."""
+    dataset = load_dataset(name)
+    bounds = get_feature_bounds()
+    rows = []
+    for i in range(len(dataset)):
+        row = {}
+        for f in FEATURE_NAMES:
+            lo, hi = bounds[f]
+            v = min(max(float(dataset.columns[f][i]), lo), hi)
+            row[f] = v if f == "oldpeak" else int(v)
+        rows.append(row)
+    weights = np.asarray(dataset.weights, dtype=np.float64)
+    return rows, weights / weights.sum()
+
+
+def parse_mix(text: str) -> dict:
+    """Parse 'predict=8,report=1,token=1' into normalised endpoint weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in --mix")
+        mix[name] = float(weight)
+    total = sum(mix.values())
+    return {k: v / total for k, v in mix.items()}
+
+
+class Workload:
+    """Builds request bodies; shared read-only across client threads."""
+
+    def __init__(self, rows, probs, mix: dict, api_key: str):
+        self.rows = rows
+        self.cum_probs = np.cumsum(probs)
+        self.api_key = api_key
+        self.endpoints = list(mix)
+        self.cum_mix = np.cumsum([mix[e] for e in self.endpoints])
+        self.report_payloads: list = []
+
+    def pick(self, rng: random.Random) -> tuple:
+        """Return (endpoint, method, path, body) for the next request."""
+        endpoint = self.endpoints[int(np.searchsorted(self.cum_mix, rng.random()))]
+        if endpoint == "token":
+            return endpoint, "GET", "/api/token", None
+        if endpoint == "report" and self.report_payloads:
+            return endpoint, "POST", "/api/report", rng.choice(self.report_payloads)
+        row = self.rows[min(int(np.searchsorted(self.cum_probs, rng.random())), len(self.rows) - 1)]
+        return "predict", "POST", "/api/predict", row
+
+
+# ---------------------------------------------------------------------------
+# HTTP client (one keep-alive connection per thread)
+# ---------------------------------------------------------------------------
+
+class Client:
+    def __init__(self, base_url: str, api_key: str, timeout: float):
+        parsed = urllib.parse.urlparse(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.api_key = api_key
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def request(self, method: str, path: str, body) -> tuple:
+        """Send one request; return (status, parsed JSON or None). Status 0 = transport error."""
+        headers = {"api-key": self.api_key}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            conn = self._conn()
+            conn.request(method, path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+            parsed = None
+            if resp.getheader("Content-Type", "").startswith("application/json"):
+                parsed = json.loads(data)
+            return resp.status, parsed
+        except (OSError, http.client.HTTPException):
+            # Drop the broken connection; the next request reconnects
+            self._local.conn.close()
+            self._local.conn = None
+            return 0, None
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []          # (endpoint, status, latency_s)
+
+    def add(self, endpoint: str, status: int, latency: float) -> None:
+        with self._lock:
+            self.samples.append((endpoint, status, latency))
+
+    def summary(self, elapsed: float) -> dict:
+        out = {"elapsed_s": round(elapsed, 3)}
+        for endpoint in (None,) + ENDPOINTS:
+            if endpoint is None:
+                picked = [s for s in self.samples if not (s[0] == "token" and s[1] == 429)]
+            else:
+                picked = [s for s in self.samples if s[0] == endpoint]
+            if not picked:
+                continue
+            lat = np.array([s[2] for s in picked]) * 1000
+            ok = sum(1 for s in picked if 200 <= s[1] < 300)
+            statuses = {}
+            for s in picked:
+                statuses[str(s[1])] = statuses.get(str(s[1]), 0) + 1
+            out[endpoint or "all"] = {
+                "requests": len(picked),
+                "throughput_rps": round(ok / elapsed, 2),
+                "error_rate": round(1 - ok / len(picked), 4),
+                "status_counts": statuses,
+                "latency_ms": {
+                    "mean": round(float(lat.mean()), 2),
+                    "p50": round(float(np.percentile(lat, 50)), 2),
+                    "p90": round(float(np.percentile(lat, 90)), 2),
+                    "p99": round(float(np.percentile(lat, 99)), 2),
+                    "max": round(float(lat.max()), 2),
+                },
+            }
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Load models
+# ---------------------------------------------------------------------------
+
+def run_closed_loop(client, workload, concurrency: int, duration: float, seed: int) -> dict:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    def worker(i: int):
+        rng = random.Random(seed + i)
+        while time.perf_counter() < deadline:
+            endpoint, method, path, body = workload.pick(rng)
+            start = time.perf_counter()
+            status, _ = client.request(method, path, body)
+            recorder.add(endpoint, status, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder.summary(time.perf_counter() - start)
+
+
+def run_open_loop(client, workload, rate: float, duration: float, seed: int,
+                  max_inflight: int) -> dict:
+    recorder = Recorder()
+    rng = random.Random(seed)
+
+    def send(scheduled: float, req: tuple):
+        endpoint, method, path, body = req
+        status, _ = client.request(method, path, body)
+        # Measured from the scheduled send time to avoid coordinated omission
+        recorder.add(endpoint, status, time.perf_counter() - scheduled)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        next_at = start
+        while next_at < start + duration:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, next_at, workload.pick(rng))
+            next_at += rng.expovariate(rate)
+    return recorder.summary(time.perf_counter() - start)
+
+
+def find_knee(steps: list) -> dict | None:
+    """
+    Pick the concurrency with the highest Kleinrock power (throughput /
+    mean latency): beyond it, extra concurrency mostly adds queueing.
+    """
+    best = None
+    for step in steps:
+        stats = step["result"].get("all")
+        if not stats or stats["latency_ms"]["mean"] <= 0:
+            continue
+        power = stats["throughput_rps"] / stats["latency_ms"]["mean"]
+        if best is None or power > best["power"]:
+            best = {
+                "concurrency": step["concurrency"],
+                "throughput_rps": stats["throughput_rps"],
+                "p99_ms": stats["latency_ms"]["p99"],
+                "power": round(power, 4),
+            }
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Local server management
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(workers: int, mongo_uri: str) -> tuple:
+    """Start uvicorn from the backend directory; return (process, base_url)."""
+    port = _free_port()
+    env = dict(os.environ, MONGO_URI=mongo_uri or "")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return proc, base_url
+        except OSError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become ready within 120s")
+
+
+def warm_up(client, workload, n: int) -> None:
+    """Prime the model / explainer and collect real predictions for report payloads."""
+    for row in workload.rows[:n]:
+        status, result = client.request("POST", "/api/predict", row)
+        if status == 200 and result:
+            workload.report_payloads.append({
+                **row,
+                **{k: result[k] for k in ("risk_probability", "risk_level",
+                                          "shap_values", "top_risk_factors", "base_value")},
+            })
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def print_step(label: str, result: dict) -> None:
+    print(f"\n== {label}  ({result['elapsed_s']}s)")
+    print(f"{'endpoint':<10}{'reqs':>8}{'ok rps':>10}{'err %':>8}"
+          f"{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name in ("all",) + ENDPOINTS:
+        s = result.get(name)
+        if not s:
+            continue
+        lat = s["latency_ms"]
+        print(f"{name:<10}{s['requests']:>8}{s['throughput_rps']:>10}"
+              f"{s['error_rate'] * 100:>8.2f}{lat['p50']:>10}{lat['p90']:>10}"
+              f"{lat['p99']:>10}{lat['max']:>10}")
+
+
+def _int_list(text: str) -> list:
+    return [int(x) for x in text.split(",") if x]
+
+
+def _float_list(text: str) -> list:
+    return [float(x) for x in text.split(",") if x]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--mongo-uri", default="", help="MONGO_URI for the local server (default: disabled)")
+    parser.add_argument("--api-key", default=API_KEY_VALUE)
+    parser.add_argument("--dataset", default="heart.csv")
+    parser.add_argument("--mix", default="predict=9,report=1",
+                        help="Relative endpoint weights, e.g. predict=8,report=1,token=1")
+    parser.add_argument("--concurrency", type=_int_list, default=[],
+                        help="Closed-loop concurrency levels, e.g. 1,2,4,8,16")
+    parser.add_argument("--rate", type=_float_list, default=[],
+                        help="Open-loop arrival rates in req/s, e.g. 10,25,50")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--max-inflight", type=int, default=256,
+                        help="Open-loop cap on concurrent in-flight requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write the full results to this file")
+    args = parser.parse_args(argv)
+
+    if not args.concurrency and not args.rate:
+        args.concurrency = [1, 2, 4, 8, 16]
+
+    rows, probs = load_patients(args.dataset)
+    workload = Workload(rows, probs, parse_mix(args.mix), args.api_key)
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        proc, base_url = start_local_server(args.workers, args.mongo_uri)
+    client = Client(base_url, args.api_key, args.timeout)
+
+    try:
+        warm_up(client, workload, n=min(50, len(rows)))
+        results = {
+            "config": {
+                "url": base_url, "workers": None if args.url else args.workers,
+                "mongo": bool(args.mongo_uri), "mix": parse_mix(args.mix),
+                "duration_s": args.duration, "dataset": args.dataset,
+            },
+            "closed_loop": [],
+            "open_loop": [],
+        }
+        for c in args.concurrency:
+            result = run_closed_loop(client, workload, c, args.duration, args.seed)
+            results["closed_loop"].append({"concurrency": c, "result": result})
+            print_step(f"closed loop, concurrency={c}", result)
+        for r in args.rate:
+            result = run_open_loop(client, workload, r, args.duration, args.seed, args.max_inflight)
+            results["open_loop"].append({"rate_rps": r, "result": result})
+            print_step(f"open loop, rate={r} req/s", result)
+
+        knee = find_knee(results["closed_loop"])
+        results["knee"] = knee
+        if knee:
+            print(f"\nKnee: concurrency={knee['concurrency']} "
+                  f"({knee['throughput_rps']} rps, p99 {knee['p99_ms']} ms)")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,25 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from xgboost import XGBClassifier
 import joblib
 import os
+import sys
+
+# The dataset cache lives in the backend so the API can share it
+sys.path.insert(0, os.path.join("..", "backend"))
+from services.dataset_cache import load_dataset  # noqa: E402
+from config import TRAINING_DATASET  # noqa: E402
 
 # -------------------------------
-# STEP 1: Load Cleaned Dataset with error handling
+# STEP 1: Load Cleaned Dataset from the binary cache with error handling
+# (parsed once from ../dataset/heart_n.csv, rebuilt when the CSV changes)
 # -------------------------------
 try:
-    df = pd.read_csv("../dataset/heart_n.csv")
-    print(f"Dataset loaded successfully. Shape: {df.shape}")
+    dataset = load_dataset(TRAINING_DATASET)
+    print(
+        f"Dataset loaded successfully. Rows: {dataset.n_source_rows} "
+        f"({len(dataset)} unique)"
+    )
 except FileNotFoundError:
-    print("Error: Dataset file '../dataset/cleaned_heart.csv' not found.")
+    print(f"Error: Dataset file '../dataset/{TRAINING_DATASET}' not found.")
     print("Please ensure the dataset file exists in the correct path.")
     exit(1)
 except Exception as e:
@@ -20,19 +30,21 @@ except Exception as e:
     exit(1)
 
 # Validate target column exists
-if "target" not in df.columns:
+if "target" not in dataset.columns:
     print("Error: 'target' column not found in dataset.")
-    print(f"Available columns: {list(df.columns)}")
+    print(f"Available columns: {list(dataset.columns)}")
     exit(1)
 
-X = df.drop("target", axis=1)
-y = df["target"]
+# Duplicate rows are collapsed in the cache; their counts become sample weights
+X = pd.DataFrame({name: col for name, col in dataset.columns.items() if name != "target"})
+y = pd.Series(dataset.columns["target"], name="target")
+w = pd.Series(dataset.weights, name="weight")
 
 # -------------------------------
 # STEP 2: Train-Test Split
 # -------------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
+X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(
+    X, y, w, test_size=0.2, random_state=42, stratify=y
 )
 
 # -------------------------------
@@ -51,15 +63,15 @@ xgb_model = XGBClassifier(
 # -------------------------------
 # STEP 4: Train & Evaluate
 # -------------------------------
-xgb_model.fit(X_train, y_train)
+xgb_model.fit(X_train, y_train, sample_weight=w_train)
 y_pred = xgb_model.predict(X_test)
 
 results = {
     "Model": "XGBoost",
-    "Accuracy": accuracy_score(y_test, y_pred),
-    "Precision": precision_score(y_test, y_pred),
-    "Recall": recall_score(y_test, y_pred),
-    "F1-Score": f1_score(y_test, y_pred)
+    "Accuracy": accuracy_score(y_test, y_pred, sample_weight=w_test),
+    "Precision": precision_score(y_test, y_pred, sample_weight=w_test),
+    "Recall": recall_score(y_test, y_pred, sample_weight=w_test),
+    "F1-Score": f1_score(y_test, y_pred, sample_weight=w_test)
 }
 
 # -------------------------------